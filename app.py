@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
-import io, os, re, time, hmac, hashlib, uuid, datetime, requests
-import numpy as np
+import os, re, time, hmac, hashlib, uuid, datetime, requests
 import plotly.express as px
 import plotly.graph_objects as go
 import smtplib
@@ -10,12 +9,21 @@ from email.mime.multipart import MIMEMultipart
 import json
 import subprocess # 🚨 넷포스 봇 연결용 부품 추가
 from supabase import create_client, Client
+import field_queue
+import dispatch_ledger
+from paged_table import paged_table, paged_editor, clear_edits
+import pipeline
+import layout_registry
+import snapshot
+from pipeline import clean_phone
 
 # ══════════════════════════════════════════
 # 설정 및 수파베이스 공통 연결
 # ══════════════════════════════════════════
 SERVER_CONTACT_FILE = "농가관리 목록_20260208 (전체).xlsx"
 SERVER_MEMBER_FILE  = "회원관리(전체).xlsx"
+STREAM_MB  = 20      # 업로드 합계가 이보다 크면 행 묶음으로 나눠 읽어 집계 (작은 서버 메모리 보호)
+CHUNK_ROWS = 50000
 
 def get_secret(k, fb=""):
     try: return st.secrets.get(k, fb)
@@ -27,6 +35,7 @@ try:
     supabase: Client = create_client(sb_url, sb_key)
 except:
     supabase = None
+field_queue.start_flusher(supabase)
 
 # ══════════════════════════════════════════
 # 유틸 함수
@@ -64,132 +73,73 @@ def send_email(sender_email, sender_password, receiver_email, subject, body):
     except Exception as e:
         return False, str(e)
 
+# 발송 성공 True, 실패 False, 이미 발송된 발주라 건너뛰면 None (실패 메시지 없이 경고만)
 def send_and_log(name, phone, text, email="", is_email=False):
     if is_email:
         if not st.session_state.get("gmail_user") or not st.session_state.get("gmail_pw"):
             st.error("Gmail 설정이 필요합니다.")
             return False
+        mode_str, target_str = "이메일", email
+    else:
+        if not st.session_state.get("api_key"): 
+            st.error("API Key 없음")
+            return False
+        mode_str, target_str = "문자", phone
+
+    # 같은 날 같은 내용의 발주는 누가 눌러도 한 번만 발송
+    key = dispatch_ledger.make_key(name, mode_str, target_str, text)
+    attempt, prev = dispatch_ledger.claim(key, name, mode_str, target_str)
+    if attempt is None:
+        st.warning(f"⚠️ 이미 발송된 발주입니다. ({prev['sent_at']} · {'발송 중' if prev['status'] == 'sending' else '발송 완료'})")
+        return None
+
+    if is_email:
         ok, res = send_email(
             st.session_state.gmail_user, st.session_state.gmail_pw, email,
             f"[품앗이소비자생활협동조합] {name} 발주 요청", text
         )
-        mode_str = "이메일"
-        target_str = email
     else:
-        if not st.session_state.get("api_key"): 
-            st.error("API Key 없음")
-            return False
         ok, res = send_sms(
             st.session_state.api_key, st.session_state.api_secret,
             st.session_state.sender_number, phone, text
         )
-        mode_str = "문자"
-        target_str = phone
-
-    st.session_state.sms_history.insert(0, {
-        "시간": datetime.datetime.now().strftime("%H:%M:%S"),
-        "수신자": name, "연락처": target_str,
-        "방식": mode_str,
-        "결과": "✅" if ok else "❌",
-        "비고": "" if ok else (res.get("errorMessage", "") if not is_email else res)
-    })
+
+    dispatch_ledger.finish(attempt, ok, res)
     return ok
 
-def clean_phone(phone):
-    if pd.isna(phone) or str(phone).strip() in ["-", "", "nan"]: return ""
-    n = re.sub(r"[^0-9]", "", str(phone))
-    if n.startswith("10") and len(n) >= 10: n = "0" + n
-    return n
+def log_note(response):
+    try: return json.loads(response).get("errorMessage", "")
+    except: return str(response)[:80]
+
+# 등록된 넷포스 양식은 필요한 열만 바로 읽고, 처음 보는 양식은 load_smart 휴리스틱 후 등록
+load_smart = st.cache_data(layout_registry.load)
 
 @st.cache_data
-def load_smart(file_obj, ftype="sales"):
-    if file_obj is None: return None, "없음"
-    df_raw = None
-    try:
-        df_raw = pd.read_excel(file_obj, header=None, engine="openpyxl")
-    except:
-        try:
-            if hasattr(file_obj, "seek"): file_obj.seek(0)
-            df_raw = pd.read_csv(file_obj, header=None, encoding="utf-8")
-        except:
-            return None, "읽기 실패"
-
-    kws = (["농가","공급자","생산자","상품","품목"] if ftype == "sales"
-           else ["회원번호","이름","휴대전화"] if ftype == "member"
-           else ["농가명","휴대전화"])
-    tgt = -1
-    for idx, row in df_raw.head(20).iterrows():
-        if sum(1 for k in kws if k in row.astype(str).str.cat(sep=" ")) >= 2:
-            tgt = idx; break
-    if tgt != -1:
-        df = df_raw.iloc[tgt+1:].copy()
-        df.columns = df_raw.iloc[tgt]
-        df.columns = df.columns.astype(str).str.replace(" ", "").str.replace("\n", "")
-        return df.loc[:, ~df.columns.str.contains("^Unnamed")], None
-    try:
-        if hasattr(file_obj, "seek"): file_obj.seek(0)
-        return (pd.read_excel(file_obj) if (hasattr(file_obj, "name") and
-                file_obj.name.endswith("xlsx")) else pd.read_csv(file_obj)), "헤더 못 찾음"
-    except:
-        return df_raw, "헤더 못 찾음"
+def load_phone_map(file_obj):
+    return pipeline.load_phone_map(file_obj, layout_registry.load)
 
-def to_num(x):
-    try:
-        s = re.sub(r"[^0-9.-]", "", str(x))
-        return float(s) if s not in ["", "."] else 0
-    except:
-        return 0
-
-def detect_cols(cols):
-    excl = ["할인","반품","취소","면세","과세","부가세"]
-    s_item   = next((c for c in cols if any(x in c for x in ["상품","품목"])), None)
-    s_qty    = next((c for c in cols if any(x in c for x in ["판매수량","수량","개수"])), None)
-    cands    = ([c for c in cols if ("총" in c and ("판매" in c or "매출" in c))] +
-                [c for c in cols if (("판매" in c or "매출" in c) and ("액" in c or "금액" in c))] +
-                [c for c in cols if "금액" in c])
-    s_amt    = next((c for c in cands if not any(b in c for b in excl)), None)
-    s_farmer = next((c for c in cols if any(x in c for x in ["공급자","농가","생산자","거래처"])), None)
-    s_spec   = next((c for c in cols if any(x in c for x in ["규격","단위","중량","용량"])), None)
-    s_date   = next((c for c in cols if any(x in c for x in ["일시","날짜","date","Date"])), None)
-    s_vat    = next((c for c in cols if any(x in c for x in ["부가세","세액","VAT"])), None)
-    return s_item, s_qty, s_amt, s_farmer, s_spec, s_date, s_vat
-
-def to_excel(df):
-    buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine="openpyxl") as w:
-        df.to_excel(w, index=False)
-    return buf.getvalue()
-
-def ext_kg(text):
-    text = str(text).lower().replace(" ", "")
-    m = re.search(r"([\d\.]+)(kg)", text)
-    if m:
-        try: return float(m.group(1))
-        except: pass
-    m = re.search(r"([\d\.]+)(g)", text)
-    if m:
-        try: return float(m.group(1)) / 1000
-        except: pass
-    return 0.0
-
-VALID_SUPPLIERS = [
-    "(주)가보트레이딩","(주)열두달","(주)우리밀","(주)윈윈농수산","(주)유기샘",
-    "(주)케이푸드","(주)한누리","G1상사","mk코리아","가가호영어조합법인",
-    "고삼농협","금강향수","나우푸드","네니아","농부생각","농업회사법인(주)담채원",
-    "당암tf","더테스트키친","도마령영농조합법인","두레생협","또또푸드","로엘팩토리",
-    "맛가마","산백유통","새롬식품","생수콩나물영농조합법인","슈가랩","씨글로벌(아라찬)",
-    "씨에이치하모니","언니들공방","에르코스","엔젤농장","우리밀농협","우신영농조합",
-    "유기농산","유안컴퍼니","인터뷰베이커리","자연에찬","장수이야기","제로웨이스트존",
-    "청양농협조합","청오건강농업회사법인","청춘농장","코레드인터내쇼날","태경F&B",
-    "토종마을","폴카닷(이은경)","하대목장","한산항아리소곡주","함지박(주)","행복우리식품영농조합"
-]
+def is_big(files):
+    return sum(getattr(f, "size", 0) for f in files) > STREAM_MB * 2**20
+
+def iter_sales(files):
+    for f in files: yield from layout_registry.iter_chunks(f, "sales", CHUNK_ROWS)
+
+@st.cache_data(show_spinner="대용량 파일을 나눠 읽는 중...")
+def zw_group_stream(files):
+    return pipeline.zw_group_chunks(iter_sales(files))
+
+# 야간 스냅샷은 버전별로 한 번만 읽어 모든 세션이 같은 객체를 공유 (복사/직렬화 없음 → 읽기 전용으로만 사용)
+# nightly.py 가 새 버전을 쓰면 자동 교체, 지난 버전은 max_entries 로 밀려남
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_snapshot(ver):
+    try: return snapshot.load(ver)
+    except Exception: return None
 
 # ══════════════════════════════════════════
 # 세션 초기화
 # ══════════════════════════════════════════
 for k, v in [
-    ("sms_history", []),
-    ("sent_history", set()),
+    ("log_page", 0),
     ("auth_passed", False),
     ("api_key", get_secret("SOLAPI_API_KEY", "")),
     ("api_secret", get_secret("SOLAPI_API_SECRET", "")),
@@ -276,11 +226,28 @@ with st.sidebar:
     st.caption("구글 계정 관리 > 보안 > 2단계 인증 > 앱 비밀번호에서 생성")
     st.divider()
     with st.expander("📋 발송 이력", expanded=False):
-        if st.session_state.sms_history:
-            log_df = pd.DataFrame(st.session_state.sms_history)
+        status_map = {"전체": None, "✅ 성공": "sent", "❌ 실패": "failed"}
+        log_status = status_map[st.selectbox("상태", list(status_map.keys()), key="log_status")]
+        log_day = st.date_input("날짜", value=None, key="log_day")
+        log_day = log_day.isoformat() if log_day else None
+        log_total = dispatch_ledger.count(day=log_day, status=log_status)
+        if log_total:
+            page_size = 20
+            last_page = (log_total - 1) // page_size
+            st.session_state.log_page = min(st.session_state.log_page, last_page)
+            rows = dispatch_ledger.page(st.session_state.log_page * page_size, page_size, day=log_day, status=log_status)
+            log_df = pd.DataFrame([{
+                "시간": r["sent_at"][5:], "수신자": r["farmer"], "연락처": r["target"], "방식": r["mode"],
+                "결과": {"sent": "✅", "failed": "❌"}.get(r["status"], "⏳"),
+                "비고": "" if r["status"] == "sent" else log_note(r["response"]),
+            } for r in rows])
             st.dataframe(log_df, hide_index=True, use_container_width=True)
-            if st.button("이력 초기화"):
-                st.session_state.sms_history = []; st.rerun()
+            pc1, pc2, pc3 = st.columns([1, 2, 1])
+            if pc1.button("◀", key="log_prev", disabled=st.session_state.log_page == 0):
+                st.session_state.log_page -= 1; st.rerun()
+            pc2.caption(f"{st.session_state.log_page + 1} / {last_page + 1} 쪽 · 총 {log_total}건")
+            if pc3.button("▶", key="log_next", disabled=st.session_state.log_page >= last_page):
+                st.session_state.log_page += 1; st.rerun()
         else:
             st.caption("아직 전송 내역이 없습니다.")
 
@@ -307,16 +274,7 @@ if menu == "📦 발주":
     if os.path.exists(SERVER_CONTACT_FILE):
         try:
             with open(SERVER_CONTACT_FILE, "rb") as f:
-                df_ci, _ = load_smart(f, "info")
-            if df_ci is not None:
-                i_name  = next((c for c in df_ci.columns if "농가명" in c), None)
-                i_phone = next((c for c in df_ci.columns if "휴대전화" in c or "전화" in c), None)
-                i_email = next((c for c in df_ci.columns if "이메일" in c or "email" in c.lower()), None)
-                if i_name and i_phone:
-                    df_ci["clean_farmer"]  = df_ci[i_name].astype(str).str.replace(" ", "")
-                    df_ci["clean_phone"] = df_ci[i_phone].apply(clean_phone)
-                    df_ci["clean_email"] = df_ci[i_email].astype(str) if i_email else ""
-                    df_phone_map = df_ci.drop_duplicates(subset=["clean_farmer"])[["clean_farmer", "clean_phone", "clean_email"]]
+                df_phone_map = load_phone_map(f)
         except:
             pass
 
@@ -364,145 +322,68 @@ if menu == "📦 발주":
 
         if not field_reqs_df.empty:
             st.markdown('<div class="section-label">📍 현장 요청 반영 중</div>', unsafe_allow_html=True)
-            st.dataframe(field_reqs_df, hide_index=True, use_container_width=True)
-
-        if up_sales:
-            parts = []
-            for f in up_sales:
-                d, _ = load_smart(f, "sales")
-                if d is not None: parts.append(d)
-
-            if parts:
-                df_s = pd.concat(parts, ignore_index=True)
-                s_item, s_qty, s_amt, s_farmer, s_spec, s_date, s_vat = detect_cols(df_s.columns.tolist())
-
-                if s_item and s_amt:
-                    def norm_name(name):
-                        n = str(name).replace(" ", "")
-                        if "지족" in n and "야채" in n: return "지족점야채"
-                        if "지족" in n and "과일" in n: return "지족점과일"
-                        if "지족" in n and "정육" in n: return "지족점정육"
-                        if "지족" in n and "공동" in n: return "지족점_공동구매"
-                        if "지족" in n and "매장" in n: return "지족매장"
-                        return re.sub(r"\(?벌크\)?", "", n)
-
-                    def disp_name(x):
-                        s = str(x).replace("*", "")
-                        return re.sub(r"\(\s*[\d\.]+\s*(?:g|kg|G|KG)\s*\)", "", s).replace("()", "").strip().replace(" ", "")
-
-                    def parent_name(x):
-                        s = str(x).replace("*", "")
-                        s = re.sub(r"\(?벌크\)?", "", s)
-                        s = re.sub(r"\(?bulk\)?", "", s, flags=re.IGNORECASE)
-                        return re.sub(r"\(\s*[\d\.]+\s*(?:g|kg|G|KG)\s*\)", "", s).replace("()", "").strip().replace(" ", "")
-
-                    valid_set = {v.replace(" ", "") for v in VALID_SUPPLIERS}
-
-                    if s_farmer:
-                        df_s["clean_farmer"] = df_s[s_farmer].apply(norm_name)
-                        df_s[s_farmer] = df_s["clean_farmer"]
-                        def classify(name):
-                            c = name.replace(" ", "")
-                            if "지족(Y)" in name or "지족(y)" in name: return "제외"
-                            if "지족" in c: return "지족(사입)"
-                            elif c in valid_set: return "일반업체"
-                            else: return "일반업체"
-                        df_s["구분"] = df_s["clean_farmer"].apply(classify)
-                        df_t = df_s[df_s["구분"] != "제외"].copy()
-                    else:
-                        df_t = df_s.copy()
-                        df_t["구분"] = "일반업체"
-                        df_t["clean_farmer"] = df_t[s_item].apply(norm_name)
-
-                    df_t[s_qty] = df_t[s_qty].apply(to_num) if s_qty else 1
-                    df_t[s_amt] = df_t[s_amt].apply(to_num)
-                    df_t.loc[(df_t[s_qty] <= 0) & (df_t[s_amt] > 0), s_qty] = 1
-                    
-                    if s_vat:
-                        df_t[s_vat] = df_t[s_vat].apply(to_num)
-                        df_t["과세구분"] = np.where(df_t[s_vat] > 0, "과세", "비과세")
-                    else:
-                        df_t["과세구분"] = "비과세"
-
-                    if s_date:
-                        df_t["__date"] = pd.to_datetime(df_t[s_date], errors="coerce")
-                        cutoff = pd.Timestamp.now() - pd.Timedelta(days=period_days)
-                        df_t = df_t[df_t["__date"] >= cutoff]
-
-                    df_t["__disp"]   = df_t[s_item].apply(disp_name)
-                    df_t["__parent"] = df_t[s_item].apply(parent_name)
-                    df_t["__unit_kg"]  = df_t.apply(lambda r: ext_kg(r.get(s_spec, "")) or ext_kg(r[s_item]), axis=1)
-                    df_t["__total_kg"] = df_t["__unit_kg"] * df_t[s_qty]
-
-                    farmer_col = s_farmer if s_farmer else "clean_farmer"
-                    agg = df_t.groupby([farmer_col, "__disp", "구분", "__parent", "과세구분"]).agg(
-                        {s_qty: "sum", s_amt: "sum", "__total_kg": "sum"}
-                    ).reset_index()
-
-                    if not df_phone_map.empty:
-                        agg["clean_farmer"] = agg[farmer_col].astype(str).str.replace(" ", "")
-                        agg = pd.merge(agg, df_phone_map, on="clean_farmer", how="left")
-                    else:
-                        agg["clean_phone"] = ""
-                        agg["clean_email"] = ""
-
-                    agg.rename(columns={farmer_col: "업체명", "__disp": "상품명", s_qty: "판매량", s_amt: "총판매액"}, inplace=True)
-                    agg = agg[agg["총판매액"] > 0].sort_values(["업체명", "__parent", "상품명"])
-
-                    agg["발주_수량"] = np.ceil(agg["판매량"] * safety / period_days)
-                    agg["발주_중량"] = np.ceil(agg["__total_kg"] * safety / period_days)
-
-                    urgent_items = set()
-                    if not field_reqs_df.empty:
-                        for _, req in field_reqs_df.iterrows():
-                            if req.get("긴급도", "") == "🔴 오늘 필요":
-                                urgent_items.add(str(req.get("품목명", "")).replace(" ", ""))
-
-                    farmer_est = agg.groupby("업체명")["총판매액"].sum() * 0.7
-                    farmer_est_df = farmer_est.reset_index()
-                    farmer_est_df.columns = ["업체명", "예상발주액_업체합계"]
-                    agg = pd.merge(agg, farmer_est_df, on="업체명", how="left")
-                    agg["예상발주액"] = agg["총판매액"] * 0.7
-
-                    def calc_priority(row):
-                        score = row["총판매액"] * 0.7  
-                        if row["상품명"].replace(" ", "") in urgent_items: score *= 3  
-                        return score
-
-                    agg["우선순위점수"] = agg.apply(calc_priority, axis=1)
-                    agg_sorted = agg.sort_values("우선순위점수", ascending=False).copy()
-                    agg_sorted["누적발주액"] = agg_sorted["예상발주액"].cumsum()
-                    agg_sorted["예산내"] = agg_sorted["누적발주액"] <= budget
-
-                    def priority_label(row):
-                        if row["상품명"].replace(" ", "") in urgent_items: return "🔴 긴급"
-                        if row["예산내"]: return "🟢 권장"
-                        return "⚪ 여유"
-
-                    agg_sorted["발주상태"] = agg_sorted.apply(priority_label, axis=1)
-
-                    est_total = agg_sorted[agg_sorted["예산내"]]["예상발주액"].sum()
-                    st.session_state.est_order_total = est_total
-                    st.session_state.order_df = agg_sorted  
-
-                    st.success("✅ 판매 데이터 분석 완료! '발주 발송' 탭을 확인하세요.")
-                    
-                    m1, m2, m3, m4 = st.columns(4)
-                    m1.metric("전체 품목", f"{len(agg_sorted)}건")
-                    m2.metric("긴급 품목", f"{(agg_sorted['발주상태']=='🔴 긴급').sum()}건")
-                    m3.metric("예산 내 품목", f"{agg_sorted['예산내'].sum()}건")
-                    m4.metric("예상 발주액", f"{est_total:,.0f}원")
-                    
-                    if budget > 0:
-                        ratio = min(est_total / budget, 1.0)
-                        bar_class = "danger" if ratio > 0.8 else "warn" if ratio > 0.5 else ""
-                        pct = int(ratio * 100)
-                        st.markdown(f"""
-                        <div style="font-size:0.8rem; color:#888; margin-bottom:2px;">
-                          예상 발주액: <b>{est_total:,.0f}원</b> / 유동자금: <b>{budget:,.0f}원</b> ({pct}% 사용)
-                        </div>
-                        <div class="budget-bar-wrap"><div class="budget-bar {bar_class}" style="width:{pct}%"></div></div>
-                        """, unsafe_allow_html=True)
+            paged_table(field_reqs_df, "field_reqs_order", sort_cols=["입력시간", "긴급도"], filter_cols=["긴급도"], page_size=10)
+
+        # 분석 입력이 그대로면 재실행 때 다시 계산하지 않고 세션의 결과/발주장부를 그대로 사용
+        urgent = pipeline.urgent_items_from(field_reqs_df)
+        snap = None if up_sales else snapshot.latest(day=datetime.date.today())
+        if not up_sales and not snap and snapshot.latest():
+            st.caption("🌙 오늘 만든 야간 분석이 없어 지난 결과는 쓰지 않습니다. 판매 파일을 올려 주세요.")
+        src = tuple(getattr(f, "file_id", f.name) for f in up_sales) if up_sales else (snap and ("snap", snap[0]))
+        order_key = (src, period_days, safety, budget, frozenset(urgent))
+        if src and st.session_state.get("order_key") != order_key:
+            agg_sorted, snap_lines = None, None
+            if up_sales and is_big(up_sales):
+                with st.spinner("대용량 파일을 나눠 읽는 중..."):
+                    agg_sorted, est_total = pipeline.build_order_chunks(iter_sales(up_sales), period_days, safety, budget, df_phone_map, field_reqs_df)
+            elif up_sales:
+                parts = []
+                for f in up_sales:
+                    d, _ = load_smart(f, "sales")
+                    if d is not None: parts.append(d)
+
+                if parts:
+                    df_s = pd.concat(parts, ignore_index=True)
+                    agg_sorted, est_total = pipeline.build_order(df_s, period_days, safety, budget, df_phone_map, field_reqs_df)
+            else:
+                # 업로드가 없으면 nightly.py 가 만들어 둔 스냅샷에서 예산/긴급도만 다시 반영
+                snap_data = load_snapshot(snap[0])
+                if snap_data and period_days in snap_data["aggs"]:
+                    agg = pipeline.apply_safety(snap_data["aggs"][period_days].copy(), safety, period_days)
+                    agg_sorted, est_total = pipeline.prioritize(agg, budget, urgent)
+                    # 기본 기간/안전계수 그대로면 농가별 발주 문구도 스냅샷 것을 사용
+                    if (period_days, round(safety, 2)) == (snap[1]["lines_period"], snap[1]["safety"]): snap_lines = snap_data["lines"]
+
+            if agg_sorted is not None:
+                st.session_state.est_order_total = est_total
+                st.session_state.order_df = agg_sorted
+                st.session_state.order_book = pipeline.order_book(agg_sorted, snap_lines)
+                st.session_state.order_key = order_key
+            elif up_sales:
+                st.warning("⚠️ 판매 파일에서 상품/금액 열이나 판매 행을 찾지 못했습니다. 넷포스에서 받은 원본 파일인지 확인해 주세요.")
+
+        if src and st.session_state.get("order_key") == order_key:
+            agg_sorted, est_total = st.session_state.order_df, st.session_state.est_order_total
+
+            if snap: st.info(f"🌙 {snap[1]['created'].replace('T', ' ')[:16]} 야간 분석 결과입니다. 새 판매 파일을 올리면 바로 다시 분석합니다.")
+            else: st.success("✅ 판매 데이터 분석 완료! '발주 발송' 탭을 확인하세요.")
+            
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("전체 품목", f"{len(agg_sorted)}건")
+            m2.metric("긴급 품목", f"{(agg_sorted['발주상태']=='🔴 긴급').sum()}건")
+            m3.metric("예산 내 품목", f"{agg_sorted['예산내'].sum()}건")
+            m4.metric("예상 발주액", f"{est_total:,.0f}원")
+            
+            if budget > 0:
+                ratio = min(est_total / budget, 1.0)
+                bar_class = "danger" if ratio > 0.8 else "warn" if ratio > 0.5 else ""
+                pct = int(ratio * 100)
+                st.markdown(f"""
+                <div style="font-size:0.8rem; color:#888; margin-bottom:2px;">
+                  예상 발주액: <b>{est_total:,.0f}원</b> / 유동자금: <b>{budget:,.0f}원</b> ({pct}% 사용)
+                </div>
+                <div class="budget-bar-wrap"><div class="budget-bar {bar_class}" style="width:{pct}%"></div></div>
+                """, unsafe_allow_html=True)
 
     with tab_field:
         st.markdown("""
@@ -538,44 +419,38 @@ if menu == "📦 발주":
 
         if st.session_state.field_requests:
             st.markdown('<div class="section-label">현재 요청 목록 (임시)</div>', unsafe_allow_html=True)
-            st.dataframe(pd.DataFrame(st.session_state.field_requests), hide_index=True, use_container_width=True)
+            paged_table(pd.DataFrame(st.session_state.field_requests), "field_reqs_tab", sort_cols=["입력시간", "긴급도"], filter_cols=["긴급도"], page_size=10)
             if st.button("🗑 임시 데이터 초기화", use_container_width=True):
                 st.session_state.field_requests = []
                 st.rerun()
 
     with tab_send:
-        if "order_df" not in st.session_state or st.session_state.order_df is None:
+        book = st.session_state.get("order_book")
+        if book is None:
             st.info("먼저 '판매데이터 분석' 탭에서 파일을 업로드해주세요.")
         else:
-            agg_all = st.session_state.order_df
-            df_saip = agg_all[agg_all["구분"] == "지족(사입)"]
-            df_balju = agg_all[agg_all["구분"] == "일반업체"]
-            
-            farmer_tax_types = df_balju.groupby("업체명")["과세구분"].unique().apply(
-                lambda x: "혼합(과세+비과세)" if len(x) > 1 else (x[0] + " 전용")
-            ).reset_index(name="농가_과세유형")
-            df_balju = pd.merge(df_balju, farmer_tax_types, on="업체명", how="left")
-            
             sub_tab1, sub_tab2 = st.tabs([f"🌾 농가 발주 대상", f"🛒 지족점 사입"])
             
             with sub_tab1:
                 tax_type = st.radio("과세 구분 선택", ["비과세 전용", "과세 전용", "혼합(과세+비과세)"], horizontal=True)
-                df_balju_tax = df_balju[df_balju["농가_과세유형"] == tax_type]
                 
                 col_left, col_right = st.columns([1, 2])
                 with col_left:
                     st.markdown('<div class="section-label">농가 선택</div>', unsafe_allow_html=True)
-                    farmer_list = df_balju_tax["업체명"].unique().tolist()
+                    farmer_list = book["by_tax"].get(tax_type, [])
                     if not farmer_list:
                         st.warning(f"{tax_type} 농가가 없습니다.")
                     else:
                         sel_farmer = st.selectbox("발주할 농가를 선택하세요", farmer_list, label_visibility="collapsed")
-                        fd = df_balju_tax[df_balju_tax["업체명"] == sel_farmer]
-                        phone = fd["clean_phone"].iloc[0] if "clean_phone" in fd.columns else ""
-                        email = fd["clean_email"].iloc[0] if "clean_email" in fd.columns else ""
-                        farmer_total = fd["총판매액"].sum()
-                        st.markdown(f"**총 판매액:** {farmer_total:,.0f}원")
-                        st.markdown(f"**품목 수:** {len(fd)}개")
+                        entry = book["farmers"][sel_farmer]
+                        fd = book["rows"].iloc[entry["rows"]]
+                        phone, email = entry["phone"], entry["email"]
+                        st.markdown(f"**총 판매액:** {entry['total']:,.0f}원")
+                        st.markdown(f"**품목 수:** {entry['count']}개")
+                        # 선택 상자 라벨에 표시하면 다른 직원이 보낼 때마다 위젯이 초기화되므로 따로 표시
+                        sent_today = dispatch_ledger.sent_farmers()
+                        st.caption(f"오늘 발송 완료 {len(sent_today & set(farmer_list))} / {len(farmer_list)} 농가")
+                        if sel_farmer in sent_today: st.caption("✅ 오늘 이 농가에 발송했습니다.")
                         if phone: st.caption(f"📞 {phone}")
                         if email: st.caption(f"📧 {email}")
                 
@@ -601,29 +476,7 @@ if menu == "📦 발주":
                             for mr in matched_requests:
                                 st.info(f"👉 **품목:** {mr.get('item_name','')} / **긴급도:** {mr.get('urgency','')} / **내용:** {mr.get('content','')}")
 
-                        def generate_order_text(df_src):
-                            grp = df_src.groupby(["과세구분", "__parent"]).agg({"발주_수량": "sum"}).reset_index()
-                            lines = []
-                            for _, r in grp.iterrows():
-                                prefix = f"[{r['과세구분']}] " if tax_type == "혼합(과세+비과세)" else ""
-                                lines.append(f"- {prefix}{r['__parent']}: {int(r['발주_수량'])}개")
-                            return lines
-
-                        base_lines = [
-                            f"[품앗이소비자생활협동조합 발주 요청]",
-                            f"{sel_farmer} 농가님, 안녕하세요.",
-                            f"조합원님들의 사랑으로 판매된 품목의 추가 발주를 요청드립니다.\n"
-                        ]
-                        base_lines.extend(generate_order_text(fd))
-                        
-                        if matched_requests:
-                            base_lines.append("\n[📌 현장 추가 요청 (확인 부탁드립니다)]")
-                            for mr in matched_requests:
-                                note = f" - {mr.get('content','')}" if mr.get('content','') else ""
-                                base_lines.append(f"- {mr.get('item_name','')} ({mr.get('urgency','')}){note}")
-                                
-                        base_lines.append("\n정직한 땀방울에 항상 감사드립니다. 🙏")
-                        default_msg = "\n".join(base_lines)
+                        default_msg = pipeline.order_message(sel_farmer, entry["lines"], matched_requests)
                         
                         msg_input = st.text_area("발주 문구 및 수량 (자유롭게 수정하세요)", value=default_msg, height=250, key=f"msg_edit_{sel_farmer}")
                         
@@ -636,9 +489,8 @@ if menu == "📦 발주":
                                     with st.spinner("문자 발송 중..."):
                                         ok = send_and_log(sel_farmer, clean_phone(in_ph), msg_input, is_email=False)
                                         if ok:
-                                            st.session_state.sent_history.add(sel_farmer)
                                             st.success("✅ 문자 발송 완료")
-                                        else: st.error("❌ 문자 발송 실패")
+                                        elif ok is False: st.error("❌ 문자 발송 실패")
                                 else: st.warning("전화번호를 입력해주세요.")
                                     
                         with c2:
@@ -648,17 +500,16 @@ if menu == "📦 발주":
                                     with st.spinner("이메일 발송 중..."):
                                         ok = send_and_log(sel_farmer, "", msg_input, email=in_em, is_email=True)
                                         if ok:
-                                            st.session_state.sent_history.add(sel_farmer)
                                             st.success("✅ 이메일 발송 완료")
-                                        else: st.error("❌ 이메일 발송 실패")
+                                        elif ok is False: st.error("❌ 이메일 발송 실패")
                                 else: st.warning("올바른 이메일 주소를 입력해주세요.")
 
             with sub_tab2:
                 saip_type = st.radio("사입 분류 선택", ["지족점정육", "지족점야채", "지족점과일", "지족매장"], horizontal=True)
-                df_saip_sub = df_saip[df_saip["업체명"] == saip_type]
+                df_saip_sub = book["saip"].get(saip_type)
                 
                 st.markdown(f"### 🛒 {saip_type} 목록")
-                if df_saip_sub.empty: 
+                if df_saip_sub is None: 
                     st.info(f"{saip_type} 사입 데이터가 없습니다.")
                 else:
                     # ▼ 새롭게 추가된 합계액 출력 로직
@@ -666,7 +517,9 @@ if menu == "📦 발주":
                     st.success(f"💰 **{saip_type} 총 판매 합계액:** {total_amt:,.0f}원")
                     
                     show_cols = ["발주상태", "업체명", "상품명", "과세구분", "판매량", "발주_수량", "총판매액"]
-                    st.dataframe(df_saip_sub[show_cols], hide_index=True, use_container_width=True)
+                    paged_table(df_saip_sub, f"saip_{saip_type}", columns=show_cols,
+                                sort_cols=["총판매액", "발주_수량", "판매량", "상품명"], search_cols=["상품명"],
+                                filter_cols=["발주상태", "과세구분"])
 
 # ══════════════════════════════════════════
 # ♻️ 제로웨이스트 및 📢 이음 코드
@@ -677,48 +530,36 @@ elif menu == "♻️ 제로웨이스트":
         up_zw = st.file_uploader("판매 실적 파일", type=["xlsx", "csv"], accept_multiple_files=True, key="zw_up")
 
     if up_zw:
-        parts = []
-        for f in up_zw:
-            d, _ = load_smart(f, "sales")
-            if d is not None: parts.append(d)
-        if parts:
-            df_zw = pd.concat(parts, ignore_index=True)
-            s_item, s_qty, s_amt, s_farmer, s_spec, _, _ = detect_cols(df_zw.columns.tolist())
-            if s_item and s_amt:
-                def parent_zw(x):
-                    s = str(x)
-                    s = re.sub(r"\(?벌크\)?", "", s)
-                    s = re.sub(r"\(?bulk\)?", "", s, flags=re.IGNORECASE)
-                    return re.sub(r"\(.*?\)", "", s).replace("*", "").replace("()", "").strip().replace(" ", "")
-
-                df_zw["__parent"] = df_zw[s_item].apply(parent_zw)
-                df_zw[s_amt] = df_zw[s_amt].apply(to_num)
-
-                def type_tag(row):
-                    i = str(row[s_item])
-                    f2 = str(row[s_farmer]) if s_farmer and pd.notna(row.get(s_farmer)) else ""
-                    return "벌크(무포장)" if ("벌크" in i or "bulk" in i.lower() or "벌크" in f2) else "일반(포장)"
-
-                df_zw["__type"] = df_zw.apply(type_tag, axis=1)
-                grp = df_zw.groupby(["__parent", "__type"])[s_amt].sum().reset_index()
-                bulk_items = grp[grp["__type"] == "벌크(무포장)"]["__parent"].unique()
-                tdf = grp[grp["__parent"].isin(bulk_items)].copy()
-
-                if len(bulk_items) == 0:
-                    st.info("벌크 데이터 없음")
-                else:
-                    cols = st.columns(2)
-                    for i, parent in enumerate(sorted(tdf["__parent"].unique())):
-                        sub = tdf[tdf["__parent"] == parent]
-                        fig = px.pie(
-                            sub, values=s_amt, names="__type",
-                            title=f"<b>{parent}</b>", hole=0.4,
-                            color="__type",
-                            color_discrete_map={"벌크(무포장)": "#27ae60", "일반(포장)": "#e74c3c"}
-                        )
-                        fig.update_layout(showlegend=True, height=280, margin=dict(t=40, b=0, l=0, r=0))
-                        with cols[i % 2]:
-                            st.plotly_chart(fig, use_container_width=True)
+        grp = None
+        if is_big(up_zw):
+            grp, s_amt = zw_group_stream(up_zw)
+        else:
+            parts = []
+            for f in up_zw:
+                d, _ = load_smart(f, "sales")
+                if d is not None: parts.append(d)
+            if parts: grp, s_amt = pipeline.zw_group(pd.concat(parts, ignore_index=True))
+        if grp is not None:
+            bulk_items = grp[grp["__type"] == "벌크(무포장)"]["__parent"].unique()
+            tdf = grp[grp["__parent"].isin(bulk_items)].copy()
+
+            if len(bulk_items) == 0:
+                st.info("벌크 데이터 없음")
+            else:
+                cols = st.columns(2)
+                for i, parent in enumerate(sorted(tdf["__parent"].unique())):
+                    sub = tdf[tdf["__parent"] == parent]
+                    fig = px.pie(
+                        sub, values=s_amt, names="__type",
+                        title=f"<b>{parent}</b>", hole=0.4,
+                        color="__type",
+                        color_discrete_map={"벌크(무포장)": "#27ae60", "일반(포장)": "#e74c3c"}
+                    )
+                    fig.update_layout(showlegend=True, height=280, margin=dict(t=40, b=0, l=0, r=0))
+                    with cols[i % 2]:
+                        st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning("⚠️ 판매 파일에서 상품/금액 열이나 판매 행을 찾지 못했습니다. 넷포스에서 받은 원본 파일인지 확인해 주세요.")
 
 elif menu == "📢 이음":
     tab_m0, tab_m1, tab_m2 = st.tabs(["⚡ 단골매칭 & 발송", "🎯 판매 기반 타겟팅", "🔍 회원 직접 검색"])
@@ -736,10 +577,7 @@ elif menu == "📢 이음":
         if up_loyal:
             df_sp, _ = load_smart(up_loyal, "sales")
             if df_sp is not None:
-                c_date   = next((c for c in df_sp.columns if any(x in c for x in ["일시","날짜","date","Date"])), None)
-                c_farmer = next((c for c in df_sp.columns if any(x in c for x in ["농가","공급자","생산자"])), None)
-                c_item   = next((c for c in df_sp.columns if any(x in c for x in ["상품","품목"])), None)
-                c_member = (next((c for c in df_sp.columns if "회원번호" in c), None) or next((c for c in df_sp.columns if c == "회원"), None))
+                c_date, c_farmer, c_item, c_member = pipeline.loyal_cols(df_sp.columns.tolist())
                 if c_date and c_farmer and c_member:
                     oc1, oc2 = st.columns(2)
                     sel_period2 = oc1.selectbox("분석 기간", ["최근 1개월", "최근 3개월", "최근 6개월"], index=1)
@@ -755,6 +593,15 @@ elif menu == "📢 이음":
 st.write("---") 
 st.subheader("📋 실시간 현장 요청 목록 (수파베이스)")
 
+fq = field_queue.counts()
+if fq["pending"] or fq["failed"]:
+    qc1, qc2, qc3 = st.columns([1, 1, 1])
+    qc1.metric("⏳ 전송 대기", f"{fq['pending']}건")
+    qc2.metric("⚠️ 전송 실패", f"{fq['failed']}건")
+    if fq["failed"] and qc3.button("🔁 실패 항목 재전송", use_container_width=True):
+        field_queue.retry_failed()
+        st.rerun()
+
 if supabase:
     try:
         response = supabase.table("staff_data").select("*").order("created_at", desc=True).execute()
@@ -776,35 +623,32 @@ if supabase:
                 df["접수시간"] = pd.to_datetime(df["접수시간"])
                 if df["접수시간"].dt.tz is None:
                     df["접수시간"] = df["접수시간"].dt.tz_localize('UTC')
+                df["__접수"] = df["접수시간"]   # 정렬은 실제 시각으로 (표시 문자열은 해가 바뀌면 순서가 틀어짐)
                 df["접수시간"] = df["접수시간"].dt.tz_convert('Asia/Seoul').dt.strftime('%m-%d %H:%M')
             except Exception as tz_e:
                 pass 
             
-            if not st.session_state.show_all_requests and len(df) > 10:
-                display_df = df.head(10)
-                has_more = True
-            else:
-                display_df = df
-                has_more = False
-
-            edited_df = st.data_editor(
-                display_df[["완료", "접수시간", "품목명", "농가명", "긴급도", "내용", "id"]],
+            edits = paged_editor(
+                df, "req_tbl", ["완료", "접수시간", "품목명", "농가명", "긴급도", "내용", "id"],
+                sort_cols=["접수시간", "긴급도", "품목명", "농가명"], search_cols=["품목명", "농가명", "내용"],
+                sort_keys={"접수시간": "__접수"} if "__접수" in df else None,
+                filter_cols=["긴급도"], page_size=50 if st.session_state.show_all_requests else 10,
                 column_config={
                     "id": None,
                     "완료": st.column_config.CheckboxColumn("처리 완료", help="발주가 끝난 항목을 체크하세요.", default=False)
                 },
-                hide_index=True,
-                use_container_width=True
+                disabled=["접수시간", "품목명", "농가명", "긴급도", "내용"]
             )
 
             col_btn1, col_btn2 = st.columns([1, 1])
             
             with col_btn1:
                 if st.button("🗑️ 체크된 항목 삭제", type="primary"):
-                    to_delete = edited_df[edited_df["완료"] == True]["id"].tolist()
+                    to_delete = [rid for rid, e in edits.items() if e.get("완료")]
                     if to_delete:
                         for req_id in to_delete:
                             supabase.table("staff_data").delete().eq("id", req_id).execute()
+                        clear_edits("req_tbl")
                         st.success(f"✅ {len(to_delete)}개의 요청이 영구 삭제되었습니다.")
                         time.sleep(1) 
                         st.rerun()
@@ -812,12 +656,12 @@ if supabase:
                         st.warning("삭제할 항목을 먼저 체크해 주세요.")
                         
             with col_btn2:
-                if has_more:
-                    if st.button("⬇️ 전체 목록 펼치기", use_container_width=True):
+                if not st.session_state.show_all_requests and len(df) > 10:
+                    if st.button("⬇️ 50개씩 크게 보기", use_container_width=True):
                         st.session_state.show_all_requests = True
                         st.rerun()
                 elif st.session_state.show_all_requests and len(df) > 10:
-                    if st.button("⬆️ 10개만 보기 (접기)", use_container_width=True):
+                    if st.button("⬆️ 10개씩 보기 (접기)", use_container_width=True):
                         st.session_state.show_all_requests = False
                         st.rerun()
                         
@@ -0,0 +1,205 @@
+import argparse, io, os, shutil, statistics, tempfile, threading, time, resource
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit
+import requests, smtplib, supabase as supabase_mod
+from streamlit.testing.v1 import AppTest, local_script_runner
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+import dispatch_ledger
+from bench.synth import generate
+
+# ══════════════════════════════════════════
+# 다중 세션 부하 테스트 (streamlit.testing AppTest)
+#  python -m bench.loadtest --users 8 --rows 20000
+#  - 직원 N명이 동시에 로그인 → 판매 파일 업로드 → 발주 발송 탭 클릭
+#  - 수파베이스 / 쿨SMS / SMTP 는 프로세스 내 가짜로 대체
+#  - 재실행 지연 p50/p95 (직렬 실행 대기 포함) 와 세션당 메모리 보고
+# ══════════════════════════════════════════
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+PASSWORD = "loadtest"
+FILES_KEY = "__loadtest_files"
+_run_lock = threading.Lock()
+
+# ── 가짜 외부 서비스 ──────────────────────────
+class FakeTable:
+    def __init__(self, db, name): self.db, self.name, self.op, self.arg, self.filt = db, name, "select", None, None
+    def select(self, *a): self.op = "select"; return self
+    def order(self, *a, **k): return self
+    def insert(self, rows): self.op, self.arg = "insert", rows; return self
+    def upsert(self, rows, **k): self.op, self.arg = "upsert", rows; return self
+    def delete(self): self.op = "delete"; return self
+    def eq(self, col, val): self.filt = (col, val); return self
+    def execute(self):
+        time.sleep(self.db.latency)
+        with self.db.lock:
+            rows = self.db.tables.setdefault(self.name, [])
+            if self.op in ("insert", "upsert"):
+                for r in (self.arg if isinstance(self.arg, list) else [self.arg]):
+                    rows.append({"id": len(rows) + 1, "created_at": "2026-01-01T09:00:00+00:00", **r})
+            elif self.op == "delete" and self.filt:
+                rows[:] = [r for r in rows if r.get(self.filt[0]) != self.filt[1]]
+            return type("Res", (), {"data": list(reversed(rows)) if self.op == "select" else []})()
+
+class FakeSupabase:
+    def __init__(self, latency):
+        self.tables, self.lock, self.latency = {}, threading.Lock(), latency
+    def table(self, name): return FakeTable(self, name)
+
+class FakeResponse:
+    status_code = 200
+    def json(self): return {"groupId": "fake", "statusCode": "2000"}
+
+class FakeSMTP:
+    def __init__(self, *a, **k): pass
+    def login(self, *a): pass
+    def send_message(self, msg): pass
+    def quit(self): pass
+
+class Upload(io.BytesIO):
+    def __init__(self, path):
+        with open(path, "rb") as f: super().__init__(f.read())
+        self.name, self.size = os.path.basename(path), len(self.getvalue())
+
+def fake_file_uploader(label, type=None, accept_multiple_files=False, key=None, **kw):
+    """AppTest 는 업로드 위젯을 조작할 수 없어 세션 상태에 넣어 둔 경로로 대체."""
+    paths = streamlit.session_state.get(FILES_KEY, {}).get(key)
+    if not paths: return [] if accept_multiple_files else None
+    files = [Upload(p) for p in paths]
+    return files if accept_multiple_files else files[0]
+
+def install_fakes(net_latency):
+    fake_db = FakeSupabase(net_latency)
+    supabase_mod.create_client = lambda url, key: fake_db
+    requests.post = lambda *a, **k: (time.sleep(net_latency), FakeResponse())[1]
+    smtplib.SMTP_SSL = FakeSMTP
+    streamlit.file_uploader = fake_file_uploader
+    # 실제 서버처럼 컴파일된 스크립트를 세션 간 공유 (AppTest 는 실행마다 새로 컴파일 →
+    # 여러 스레드에서 동시에 compile 하면 CPython AST 오류가 남)
+    shared = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared
+    return fake_db
+
+# ── 측정 ──────────────────────────────────
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:  # /proc 없는 환경 → 최대 RSS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def session_mb(at):
+    """세션에 남는 분석 결과 크기: order_df + 발주장부(농가별 행 + 지족 사입 표)."""
+    frames = []
+    for k in ("order_df", "order_book"):
+        try: v = at.session_state[k]
+        except Exception: continue
+        frames += [v["rows"], *v["saip"].values()] if k == "order_book" else [v]
+    return sum(f.memory_usage(deep=True).sum() for f in frames) / 2**20
+
+class Session:
+    def __init__(self, idx, sales_paths, timeout):
+        self.idx, self.lat, self.errors = idx, [], []
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        self.at.secrets["supabase"] = {"url": "http://fake", "key": "fake"}
+        self.at.secrets["APP_PASSWORD"] = PASSWORD
+        self.at.secrets["SOLAPI_API_KEY"] = "fake"
+        self.at.secrets["SOLAPI_API_SECRET"] = "fake"
+        self.at.secrets["SENDER_NUMBER"] = "0100000000"
+        self.at.session_state[FILES_KEY] = {"ord_up": sales_paths}
+
+    def step(self, name, fn=None):
+        # AppTest 는 설정/시크릿/런타임을 전역으로 바꾸므로 실행 자체는 한 번에 하나씩.
+        # 대기 시간까지 포함한 지연 = 단일 서버 프로세스에서 GIL 을 나눠 쓰는 상황과 비슷
+        t0 = time.perf_counter()
+        with _run_lock:
+            t1 = time.perf_counter()
+            (fn or (lambda: self.at.run()))()
+            t2 = time.perf_counter()
+            if self.at.exception:
+                self.errors.append((name, self.at.exception[0].message))
+        self.lat.append((name, t2 - t0, t2 - t1))
+
+    def scenario(self, clicks):
+        at = self.at
+        self.step("첫 화면")
+        at.text_input[0].input(PASSWORD)
+        self.step("로그인", lambda: at.button[0].click().run())
+        # 업로드는 첫 재실행에서 분석까지 끝남 (탭은 모두 렌더링됨)
+        self.step("업로드/분석")
+        for i in range(clicks):
+            radios = [r for r in at.radio if r.label == "과세 구분 선택"]
+            if radios:
+                opts = radios[0].options
+                self.step("과세 선택", lambda: radios[0].set_value(opts[i % len(opts)]).run())
+            boxes = [s for s in at.selectbox if s.label == "발주할 농가를 선택하세요"]
+            if boxes and boxes[0].options:
+                opts = boxes[0].options
+                farmer = opts[(self.idx + i) % len(opts)]
+                self.step("농가 선택", lambda: boxes[0].set_value(farmer).run())
+                phones = [t for t in at.text_input if t.key == f"in_ph_{farmer}"]
+                if phones and not phones[0].value: phones[0].input("010-0000-0000")
+                sms = [b for b in at.button if b.key == f"btn_sms_{farmer}"]
+                if sms: self.step("문자 발송", lambda: sms[0].click().run())
+
+def pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))] if xs else 0.0
+
+def main():
+    ap = argparse.ArgumentParser(description="시다 워크 다중 세션 부하 테스트")
+    ap.add_argument("--users", type=int, default=5)
+    ap.add_argument("--rows", type=int, default=20000)
+    ap.add_argument("--clicks", type=int, default=5, help="세션당 과세/농가 선택 반복 횟수")
+    ap.add_argument("--net-latency", type=float, default=0.05, help="가짜 외부 API 지연(초)")
+    ap.add_argument("--timeout", type=float, default=120)
+    ap.add_argument("--format", choices=["xlsx", "csv"], default="xlsx")
+    a = ap.parse_args()
+
+    work = tempfile.mkdtemp(prefix="sida_load_")
+    cwd = os.getcwd()
+    try:
+        # 앱은 상대경로로 서버 파일/로컬 DB 를 사용 → 임시 폴더에서 실행
+        paths = generate(work, a.rows, fmt=a.format, seed=1)
+        # load_smart 는 엑셀 실패 시 CSV 로 읽으므로 형식과 무관하게 서버 파일명으로 복사
+        shutil.copy(paths["contact"], os.path.join(work, "농가관리 목록_20260208 (전체).xlsx"))
+        shutil.copy(paths["member"], os.path.join(work, "회원관리(전체).xlsx"))
+        os.chdir(work)
+        install_fakes(a.net_latency)
+
+        rss0 = rss_mb()
+        sessions = [Session(i, [paths["sales"]], a.timeout) for i in range(a.users)]
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=a.users) as ex:
+            list(ex.map(lambda s: s.scenario(a.clicks), sessions))
+        wall = time.perf_counter() - t0
+        rss1 = rss_mb()
+        ledger_sent = dispatch_ledger.count(status="sent")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+    by_step = {}
+    for s in sessions:
+        for name, total, run in s.lat: by_step.setdefault(name, []).append((total, run))
+    by_step["전체"] = [(total, run) for s in sessions for _, total, run in s.lat]
+
+    ms = lambda x: f"{x * 1000:7.0f}ms"
+    print(f"\n■ 세션 {a.users}개 × 클릭 {a.clicks}회, 판매 {a.rows:,}행 ({a.format}), 전체 {wall:.1f}초")
+    print("  ※ 재실행은 _run_lock 으로 한 번에 하나씩 → p50/p95 는 대기열 대기 포함, 실제 동시 실행 지연이 아님")
+    print(f"  {'단계':10s} {'횟수':>5s} {'p50':>9s} {'p95':>9s} {'max':>9s}   | 실행만 p50 / p95")
+    for name, xs in by_step.items():
+        tot, run = [x[0] for x in xs], [x[1] for x in xs]
+        print(f"  {name:10s} {len(xs):5d} {ms(pct(tot, 50))} {ms(pct(tot, 95))} {ms(max(tot))}   | {ms(pct(run, 50))} / {ms(pct(run, 95))}")
+    print(f"\n  RSS {rss0:.0f}MB → {rss1:.0f}MB (세션당 약 {(rss1 - rss0) / a.users:.1f}MB)")
+    print(f"  세션 상태 (order_df + 발주장부) 평균 {statistics.mean(session_mb(s.at) for s in sessions):.2f}MB")
+    sent = len([1 for s in sessions for n, _, _ in s.lat if n == "문자 발송"])
+    print(f"  문자 발송 클릭 {sent}회 → 장부 발송 {ledger_sent}건 (나머지는 중복 차단)")
+    errs = [(s.idx, n, m) for s in sessions for n, m in s.errors]
+    if errs:
+        print(f"\n⚠️ 오류 {len(errs)}건")
+        for e in errs[:10]: print("  ", e)
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
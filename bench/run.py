@@ -0,0 +1,156 @@
+import argparse, io, json, os, platform, statistics, subprocess, tempfile, time, datetime
+
+import pandas as pd
+
+import pipeline
+import layout_registry
+from bench.synth import generate
+
+# ══════════════════════════════════════════
+# 분석 파이프라인 벤치마크
+#  python -m bench.run --sizes 10000,50000
+#  결과는 bench/history.jsonl 에 누적, 직전 기록 대비 느려지면 경고
+# ══════════════════════════════════════════
+HISTORY = os.path.join(os.path.dirname(__file__), "history.jsonl")
+
+class Upload(io.BytesIO):
+    """스트림릿 UploadedFile 흉내 (name 속성 있는 바이트 버퍼)."""
+    def __init__(self, path):
+        with open(path, "rb") as f: super().__init__(f.read())
+        self.name = os.path.basename(path)
+
+def _time(fn, setup, repeat):
+    ts = []
+    for _ in range(repeat):
+        arg = setup()
+        t0 = time.perf_counter()
+        fn(arg)
+        ts.append(time.perf_counter() - t0)
+    return min(ts), statistics.median(ts)
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip()
+    except Exception:
+        return ""
+
+def _same(a, b):
+    if a is None or b is None: return a is b
+    if not isinstance(a, pd.DataFrame): return a == b
+    try:
+        pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False)
+        return True
+    except AssertionError:
+        return False
+
+def check_size(paths, layouts, df_phone, period_days, safety, budget):
+    """빠른 경로가 load_smart 기준 결과와 같은지 확인, 다른 단계 이름 목록 반환."""
+    now = pd.Timestamp.now()
+    order = lambda df: pipeline.build_order(df.copy(), period_days, safety, budget, df_phone, now=now)[0]
+    chunks = lambda: layout_registry.iter_chunks(Upload(paths["sales"]), "sales", 20000, layouts)
+    ref, _ = pipeline.load_smart(Upload(paths["sales"]), "sales")
+    fast, _ = layout_registry.load(Upload(paths["sales"]), "sales", layouts)
+    # 등록된 계획으로 직접 읽은 행 수 (load 의 휴리스틱 되돌아가기 없이 → 합성 엑셀의 A1 범위도 다 읽는지)
+    with open(layouts, encoding="utf-8") as f:
+        plan = next(p for p in json.load(f).values() if p["ftype"] == "sales")
+    direct = sum(len(c) for c in layout_registry.iter_with_plan(Upload(paths["sales"]), plan, 20000))
+    pairs = {
+        "등록양식_직접읽기": (len(ref), direct),
+        "load_등록양식": (ref[fast.columns].rename_axis(columns=None).astype(str), fast.astype(str)),  # 값만 비교 (dtype 무시)
+        "발주_등록양식": (order(ref), order(fast)),
+        "발주_나눠읽기": (order(ref), pipeline.build_order_chunks(chunks(), period_days, safety, budget, df_phone, now=now)[0]),
+        "제로웨이스트_나눠읽기": (pipeline.zw_group(ref.copy())[0], pipeline.zw_group_chunks(chunks())[0]),
+    }
+    return [k for k, (a, b) in pairs.items() if not _same(a, b)]
+
+def bench_size(paths, repeat, period_days=7, safety=1.1, budget=30000000):
+    df_s, _ = pipeline.load_smart(Upload(paths["sales"]), "sales")
+    df_mem, _ = pipeline.load_smart(Upload(paths["member"]), "member")
+    df_phone = pipeline.load_phone_map(Upload(paths["contact"]))
+    # 합성 농가는 모두 전화번호가 있음 → 판매 농가 대부분과 맞지 않으면 헤더를 잘못 찾은 것
+    farmers = set(df_s[pipeline.detect_cols(df_s.columns.tolist())[3]].astype(str).str.replace(" ", ""))
+    hit = df_phone[df_phone["clean_phone"] != ""]["clean_farmer"].isin(farmers).sum() if not df_phone.empty else 0
+    if hit < len(df_phone) / 2 or df_phone.empty:
+        raise SystemExit(f"연락처 파일에서 농가 전화번호를 읽지 못했습니다 ({hit}/{len(df_phone)}): {paths['contact']}")
+    layouts = os.path.join(os.path.dirname(paths["sales"]), "export_layouts.json")
+    layout_registry.load(Upload(paths["sales"]), "sales", layouts)  # 양식 등록 (이후 빠른 경로)
+    cols = pipeline.detect_cols(df_s.columns.tolist())
+    df_t = pipeline.normalize_sales(df_s.copy(), cols, period_days)
+    agg = pipeline.aggregate_sales(df_t, cols, df_phone, safety, period_days)
+
+    stages = {
+        "load_smart":     (lambda f: pipeline.load_smart(f, "sales"), lambda: Upload(paths["sales"])),
+        "load_등록양식":   (lambda f: layout_registry.load(f, "sales", layouts), lambda: Upload(paths["sales"])),
+        "detect_cols":    (lambda c: [pipeline.detect_cols(c) for _ in range(1000)], lambda: df_s.columns.tolist()),
+        "발주_정규화":     (lambda d: pipeline.normalize_sales(d, cols, period_days), lambda: df_s.copy()),
+        "발주_집계":       (lambda d: pipeline.prioritize(pipeline.aggregate_sales(d, cols, df_phone, safety, period_days), budget, set()),
+                           lambda: df_t.copy()),
+        "제로웨이스트_그룹": (pipeline.zw_group, lambda: df_s.copy()),
+        "단골_매칭":       (lambda d: pipeline.match_loyal(d, df_mem, 3, 4), lambda: df_s),
+        "발주_나눠읽기":    (lambda f: pipeline.build_order_chunks(layout_registry.iter_chunks(f, "sales", 20000, layouts),
+                                                            period_days, safety, budget, df_phone), lambda: Upload(paths["sales"])),
+        "제로웨이스트_나눠읽기": (lambda f: pipeline.zw_group_chunks(layout_registry.iter_chunks(f, "sales", 20000, layouts)),
+                           lambda: Upload(paths["sales"])),
+    }
+    out = {}
+    for name, (fn, setup) in stages.items():
+        out[name] = _time(fn, setup, repeat)
+    bad = check_size(paths, layouts, df_phone, period_days, safety, budget)
+    return out, {"rows": len(df_s), "agg_rows": len(agg), "mismatch": bad}
+
+def _last_runs(path):
+    last = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try: r = json.loads(line)
+                except ValueError: continue
+                last[(r["host"], r["size"], r["fmt"], r["stage"])] = r
+    return last
+
+def main():
+    ap = argparse.ArgumentParser(description="분석 파이프라인 벤치마크")
+    ap.add_argument("--sizes", default="10000,50000")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--format", choices=["xlsx", "csv"], default="xlsx")
+    ap.add_argument("--data", default=None, help="합성 데이터 폴더 (기본: 임시 폴더)")
+    ap.add_argument("--history", default=HISTORY)
+    ap.add_argument("--threshold", type=float, default=1.2, help="직전 기록 대비 이 배수 이상 느리면 회귀")
+    ap.add_argument("--no-save", action="store_true")
+    a = ap.parse_args()
+
+    host = platform.node()
+    last = _last_runs(a.history)
+    stamp = datetime.datetime.now().isoformat(timespec="seconds")
+    meta = {"ts": stamp, "rev": _git_rev(), "host": host, "python": platform.python_version(), "pandas": pd.__version__}
+    records, regressions, mismatches = [], [], []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [int(s) for s in a.sizes.split(",")]:
+            paths = generate(a.data or tmp, size, fmt=a.format, seed=size)
+            res, info = bench_size(paths, a.repeat)
+            print(f"\n■ {size:,}행 ({a.format}, 발주 집계 {info['agg_rows']:,}행)")
+            print("  결과 검증 " + ("✅ 기준 경로와 같음" if not info["mismatch"] else f"❌ 다름: {', '.join(info['mismatch'])}"))
+            mismatches += [(size, m) for m in info["mismatch"]]
+            for stage, (best, med) in res.items():
+                prev = last.get((host, size, a.format, stage))
+                ratio = best / prev["best"] if prev and prev["best"] > 0 else None
+                flag = "  ⚠️ 회귀" if ratio and ratio >= a.threshold else ""
+                if flag: regressions.append((size, stage, ratio))
+                print(f"  {stage:12s} best {best * 1000:9.1f}ms  median {med * 1000:9.1f}ms"
+                      + (f"  (직전 대비 x{ratio:.2f})" if ratio else "") + flag)
+                records.append({**meta, "size": size, "fmt": a.format, "stage": stage, "best": best, "median": med})
+
+    if not a.no_save:
+        with open(a.history, "a", encoding="utf-8") as f:
+            for r in records: f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    if regressions:
+        print(f"\n⚠️ 회귀 {len(regressions)}건 (기준 x{a.threshold})")
+    if mismatches:
+        print(f"\n❌ 결과 불일치 {len(mismatches)}건: {mismatches}")
+    if regressions or mismatches:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse, os, re, zipfile
+import numpy as np
+import pandas as pd
+
+from pipeline import VALID_SUPPLIERS
+
+# ══════════════════════════════════════════
+# 합성 데이터 생성기 (개인정보 없는 넷포스 형식 엑셀/CSV)
+#  - 판매 실적: 헤더 위 잡행 + 한글 열 + (벌크)/(500g) 규격 + 지족점 사입처
+#  - 회원관리 / 농가관리 목록: 같은 회원번호·농가명으로 맞춘 짝 파일
+# ══════════════════════════════════════════
+SYL_A = list("한새푸솔들별참봄달햇늘빛초숲강산")
+SYL_B = list("빛솔들누담마온잎결터샘울림나라")
+SUFFIX = ["농장", "농원", "영농조합", "팜", "농가", "유기농"]
+SURNAMES = list("김이박최정강조윤장임한오서신권황안송류홍")
+GIVEN = list("민서지현수영준우하은도윤재희성진아연호")
+
+ITEMS = [  # (이름, 규격 후보, 단가, 과세 여부)
+    ("감자", ["(1kg)", "(500g)", "(벌크)"], 4500, False),
+    ("양파", ["(1kg)", "(벌크)"], 3800, False),
+    ("당근", ["(500g)", "(벌크)"], 2900, False),
+    ("상추", ["(200g)", "(150g)"], 2500, False),
+    ("딸기", ["(500g)", "(1kg)"], 12000, False),
+    ("사과", ["(2kg)", "(벌크)"], 15000, False),
+    ("현미(유기농)", ["(4kg)", "(1kg)", "(벌크)"], 18000, False),
+    ("백미(햅쌀)", ["(10kg)", "(4kg)"], 32000, False),
+    ("두부", ["(300g)"], 3200, True),
+    ("콩나물", ["(300g)"], 1800, False),
+    ("된장", ["(500g)", "(1kg)"], 11000, True),
+    ("우유식빵", [""], 5500, True),
+    ("주방세제", ["(500ml)", "(벌크)"], 6900, True),
+    ("한우불고기", ["(300g)", "(500g)"], 16000, True),
+    ("유정란", ["(10구)"], 7200, False),
+    ("청양고추", ["(100g)", "(벌크)"], 2200, False),
+]
+N_CATALOG = 4  # 공급자당 취급 품목 수 (과세 품목 수 이하)
+SAIP = ["지족점야채", "지족점과일", "지족점정육", "지족매장", "지족점(벌크)", "지족(Y)"]
+
+def _names(rng, n, parts_a, parts_b, suffixes):
+    out, seen = [], set()
+    while len(out) < n:
+        s = rng.choice(parts_a) + rng.choice(parts_b) + (rng.choice(suffixes) if suffixes else "")
+        if s in seen: s += str(len(out))
+        seen.add(s); out.append(s)
+    return out
+
+def _phone(rng, n):
+    # 010-0xxx-xxxx 대역은 실사용 번호가 아님
+    return [f"010-0{rng.integers(100, 999)}-{rng.integers(1000, 9999)}" for _ in range(n)]
+
+def _with_junk(df, junk):
+    """넷포스 엑셀처럼 헤더 위에 제목/조회조건 행을 붙인 원시 표."""
+    width = len(df.columns)
+    pad = lambda r: list(r) + [None] * (width - len(r))
+    rows = [pad(r) for r in junk] + [list(df.columns)] + df.astype(object).values.tolist()
+    return pd.DataFrame(rows)
+
+def _write(raw, path):
+    if path.endswith(".csv"):
+        # 넷포스 CSV 처럼 빈 잡행은 쉼표 없는 진짜 빈 줄로
+        lines = raw.to_csv(index=False, header=False, lineterminator="\n").split("\n")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join("" if not l.strip(",") else l for l in lines))
+    else:
+        raw.to_excel(path, index=False, header=False)
+        _netforce_dimension(path)
+
+def _netforce_dimension(path):
+    """넷포스 엑셀처럼 시트에 저장된 범위를 A1 로 (읽기 전용 openpyxl 은 이 값을 믿음)."""
+    tmp = path + ".tmp"
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename.startswith("xl/worksheets/sheet"):
+                data = re.sub(rb'<dimension ref="[^"]*"\s*/>', b'<dimension ref="A1"/>', data, count=1)
+            dst.writestr(item, data)
+    os.replace(tmp, path)
+
+def make_world(rng, n_farmers=120, n_members=2000):
+    farmers = _names(rng, n_farmers, SYL_A, SYL_B, SUFFIX)
+    members = pd.DataFrame({
+        "회원번호": rng.choice(np.arange(1000, 1000 + n_members * 10), n_members, replace=False),
+        "이름": [rng.choice(SURNAMES) + rng.choice(GIVEN) + rng.choice(GIVEN) for _ in range(n_members)],
+        "휴대전화번호": _phone(rng, n_members),
+    })
+    return farmers, members
+
+def make_sales(rng, n_rows, farmers, members, days=30, now=None):
+    now = now or pd.Timestamp.now().floor("s")
+    suppliers = np.array(farmers + VALID_SUPPLIERS[:15] + SAIP, dtype=object)
+    w = np.r_[np.full(len(farmers), 1.0), np.full(15, 0.6), np.full(len(SAIP), 4.0)]
+    # 공급자마다 고정 취급 품목 → 농가는 비과세 전용 / 과세 전용 / 혼합이 고루 나옴
+    free = [i for i, x in enumerate(ITEMS) if not x[3]]
+    tax = [i for i, x in enumerate(ITEMS) if x[3]]
+    pool = [free, tax, list(range(len(ITEMS)))]
+    kind = np.r_[rng.choice(3, len(farmers), p=[0.6, 0.2, 0.2]), np.full(len(suppliers) - len(farmers), 2)]
+    catalog = np.array([rng.choice(pool[k], N_CATALOG, replace=False) for k in kind])
+    sup_i = rng.choice(len(suppliers), n_rows, p=w / w.sum())
+    slot = rng.integers(0, N_CATALOG, n_rows)
+    mem_i = rng.integers(0, len(members), n_rows)
+    mem = np.where(rng.random(n_rows) < 0.8, members["회원번호"].to_numpy()[mem_i], 0)
+    # 회원마다 단골 품목 3개 → 절반은 그 안에서 구매 (단골 매칭이 잡히도록)
+    habit_sup = rng.choice(len(suppliers), (len(members), 3), p=w / w.sum())
+    habit_slot = rng.integers(0, N_CATALOG, (len(members), 3))
+    h = rng.integers(0, 3, n_rows)
+    use = (mem > 0) & (rng.random(n_rows) < 0.5)
+    sup_i[use] = habit_sup[mem_i[use], h[use]]
+    slot[use] = habit_slot[mem_i[use], h[use]]
+    it = catalog[sup_i, slot]
+    sup = suppliers[sup_i]
+    spec = np.array([rng.choice(ITEMS[i][1]) for i in it], dtype=object)
+    # 벌크 규격은 상품명에도 붙음 (예: 감자(벌크))
+    name = np.array([ITEMS[i][0] + (s if s == "(벌크)" or rng.random() < 0.3 else "") for i, s in zip(it, spec)], dtype=object)
+    qty = rng.integers(1, 4, n_rows)
+    qty[rng.random(n_rows) < 0.01] = -1  # 반품
+    price = np.array([ITEMS[i][2] for i in it])
+    amt = qty * price
+    taxed = np.array([ITEMS[i][3] for i in it])
+    when = now - pd.to_timedelta(rng.integers(0, days * 86400, n_rows), unit="s")
+    df = pd.DataFrame({
+        "번호": np.arange(1, n_rows + 1),
+        "판매일시": when.strftime("%Y-%m-%d %H:%M:%S"),
+        "회원번호": np.where(mem > 0, mem.astype(str), ""),
+        "공급자명": sup,
+        "상품명": name,
+        "규격": spec,
+        "판매수량": qty,
+        "판매단가": price,
+        "총판매액": amt,
+        "할인금액": 0,
+        "부가세": np.where(taxed, np.round(amt / 11), 0).astype(int),
+        "결제구분": rng.choice(["카드", "현금", "포인트"], n_rows),
+    }).sort_values("판매일시", kind="stable")
+    junk = [
+        ["상품별 판매내역"], [],
+        ["조회기간", None, f"{(now - pd.Timedelta(days=days)):%Y-%m-%d} ~ {now:%Y-%m-%d}"],
+        ["매장", None, "지족점", None, "상품분류", None, "전체"],
+        [],
+    ]
+    return _with_junk(df.reset_index(drop=True), junk)
+
+def make_members(rng, members):
+    df = members.copy()
+    df["주소"] = "대전광역시 유성구 " + pd.Series(rng.choice(["지족동", "노은동", "반석동"], len(df)))
+    df["가입일"] = "2020-01-01"
+    df["매장\n가입상태"] = "가입"
+    df["최근구매일"] = ""
+    df["출자금"] = 50000
+    df["메모"] = ""
+    junk = [["회원관리"], [], ["회원명", None, "휴대전화"], ["주소", None, "SMS수신"], []]
+    return _with_junk(df, junk)
+
+def make_contacts(rng, farmers):
+    n = len(farmers)
+    df = pd.DataFrame({
+        "번호": np.arange(1, n + 1), "출하상태": "가능", "농가명": farmers,
+        "농가번호": np.arange(5000, 5000 + n), "생산방식": "농산물(1차)", "사업자구분": "일반농가",
+        "휴대전화번호": _phone(rng, n), "email": [f"farm{i}@example.com" for i in range(n)],
+        "지점": "지족점", "활동여부": "활동",
+    })
+    # 실제 농가관리 목록과 같은 조회조건 행 (4행에 '농가명 … 휴대전화번호' 도 있음), 헤더는 15행
+    cond = [("농가명", None, "생산방식", "선택", "휴대전화번호"), ("지점", "선택", None, None, "사업자구분"),
+            ("인증여부", "선택", None, None, "농가구분"), ("품목분류", "대분류 전체", "중분류 전체", None, "정렬"),
+            ("정산은행", "선택", None, None, "출하상태"), ("성별", "전체", None, None, "판매유형"),
+            ("조합", "선택", None, None, "판매내역SMS"), ("읍면동구분", "선택 :", None, None, "비고"),
+            ("기획생산등록여부", "전체", None, None, "기획생산업데이트기간"), ("차등수수료", "전체", None, None, None)]
+    junk = [["농가관리 목록"], [], []] + [[a, None, b, None, c, None, d, None, e] for a, b, c, d, e in cond] + [[]]
+    return _with_junk(df, junk)
+
+def generate(out_dir, rows, farmers=120, members=2000, days=30, fmt="xlsx", seed=0, now=None):
+    """판매/회원/농가 파일 3종 생성 후 경로 dict 반환."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    f_names, mem = make_world(rng, farmers, members)
+    paths = {
+        "sales":   os.path.join(out_dir, f"sales_{rows}.{fmt}"),
+        "member":  os.path.join(out_dir, f"member_{members}.{fmt}"),
+        "contact": os.path.join(out_dir, f"contact_{farmers}.{fmt}"),
+    }
+    _write(make_sales(rng, rows, f_names, mem, days, now), paths["sales"])
+    _write(make_members(rng, mem), paths["member"])
+    _write(make_contacts(rng, f_names), paths["contact"])
+    return paths
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="합성 넷포스 판매/회원/농가 파일 생성")
+    ap.add_argument("--rows", type=int, default=10000)
+    ap.add_argument("--farmers", type=int, default=120)
+    ap.add_argument("--members", type=int, default=2000)
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--format", choices=["xlsx", "csv"], default="xlsx")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="synth_data")
+    a = ap.parse_args()
+    for k, p in generate(a.out, a.rows, a.farmers, a.members, a.days, a.format, a.seed).items():
+        print(f"{k:8s} {p}")
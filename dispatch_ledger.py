@@ -0,0 +1,118 @@
+import sqlite3, json, time, hashlib, datetime, threading
+
+# ══════════════════════════════════════════
+# 발주 발송 장부 (SQLite, 직원 간 공유)
+#  - 발송 시도 1회 = 1행 (실패한 시도도 응답과 함께 남김)
+#  - 내용 해시 멱등키: 같은 날 같은 발주는 '발송 중/완료' 행이 하나만 있을 수 있음 (부분 유일 인덱스)
+#  - 날짜 / 농가 / 상태 조회용 인덱스
+# ══════════════════════════════════════════
+LEDGER_DB   = "dispatch_ledger.db"
+STALE_SEC   = 600   # 'sending' 상태로 멈춘 건(앱 중단 등)은 10분 뒤 재시도 허용
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dispatch (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    idem_key    TEXT NOT NULL,
+    sent_date   TEXT NOT NULL,
+    sent_at     TEXT NOT NULL,
+    farmer      TEXT NOT NULL,
+    mode        TEXT NOT NULL,
+    target      TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    response    TEXT NOT NULL DEFAULT '',
+    claimed_at  REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_dispatch_active ON dispatch(idem_key) WHERE status IN ('sending', 'sent');
+CREATE INDEX IF NOT EXISTS ix_dispatch_key    ON dispatch(idem_key, id);
+CREATE INDEX IF NOT EXISTS ix_dispatch_date   ON dispatch(sent_date, id);
+CREATE INDEX IF NOT EXISTS ix_dispatch_farmer ON dispatch(farmer, sent_date);
+CREATE INDEX IF NOT EXISTS ix_dispatch_status ON dispatch(status, sent_date);
+"""
+
+_init_lock = threading.Lock()
+_inited = set()
+
+def _conn(path=LEDGER_DB):
+    con = sqlite3.connect(path, timeout=10, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    with _init_lock:
+        if path not in _inited:
+            con.executescript(_SCHEMA)
+            _inited.add(path)
+    return con
+
+def make_key(farmer, mode, target, text, day=None):
+    day = day or datetime.date.today().isoformat()
+    raw = "\x1f".join([day, str(farmer), str(mode), str(target), str(text).strip()])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def claim(key, farmer, mode, target, path=LEDGER_DB):
+    """발송 직전 호출. (시도 id, None) 이면 발송 진행, (None, 기존행) 이면 이미 발송(중)."""
+    now = datetime.datetime.now()
+    con = _conn(path)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        row = con.execute("SELECT id, status, sent_at, claimed_at FROM dispatch "
+                          "WHERE idem_key=? AND status IN ('sending', 'sent')", (key,)).fetchone()
+        if row and (row[1] == "sent" or time.time() - row[3] < STALE_SEC):
+            con.execute("ROLLBACK")
+            return None, {"status": row[1], "sent_at": row[2]}
+        if row:  # 멈춘 시도는 실패로 닫고 새 시도를 남김
+            con.execute("UPDATE dispatch SET status='failed', response=? WHERE id=?", ("응답 없이 중단됨", row[0]))
+        cur = con.execute(
+            "INSERT INTO dispatch(idem_key, sent_date, sent_at, farmer, mode, target, status, claimed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, 'sending', ?)",
+            (key, now.date().isoformat(), now.strftime("%Y-%m-%d %H:%M:%S"), str(farmer), mode, str(target), time.time()))
+        con.execute("COMMIT")
+        return cur.lastrowid, None
+    finally:
+        con.close()
+
+def finish(attempt, ok, response, path=LEDGER_DB):
+    """claim 이 돌려준 시도 id 의 결과와 응답 기록."""
+    res = response if isinstance(response, str) else json.dumps(response, ensure_ascii=False, default=str)
+    con = _conn(path)
+    try:
+        con.execute("UPDATE dispatch SET status=?, response=? WHERE id=?",
+                    ("sent" if ok else "failed", res[:2000], attempt))
+    finally:
+        con.close()
+
+def _where(day=None, farmer=None, status=None):
+    conds, args = [], []
+    if day:    conds.append("sent_date=?"); args.append(day)
+    if farmer: conds.append("farmer=?");    args.append(farmer)
+    if status: conds.append("status=?");    args.append(status)
+    return (" WHERE " + " AND ".join(conds) if conds else ""), args
+
+def count(day=None, farmer=None, status=None, path=LEDGER_DB):
+    w, args = _where(day, farmer, status)
+    con = _conn(path)
+    try:
+        return con.execute(f"SELECT COUNT(*) FROM dispatch{w}", args).fetchone()[0]
+    finally:
+        con.close()
+
+def page(offset=0, limit=20, day=None, farmer=None, status=None, path=LEDGER_DB):
+    """최신순 한 페이지만 조회 (list of dict)."""
+    w, args = _where(day, farmer, status)
+    con = _conn(path)
+    con.row_factory = sqlite3.Row
+    try:
+        rows = con.execute(
+            f"SELECT sent_at, farmer, target, mode, status, response FROM dispatch{w} "
+            f"ORDER BY sent_date DESC, id DESC LIMIT ? OFFSET ?", args + [limit, offset]
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        con.close()
+
+def sent_farmers(day=None, path=LEDGER_DB):
+    day = day or datetime.date.today().isoformat()
+    con = _conn(path)
+    try:
+        return {r[0] for r in con.execute(
+            "SELECT DISTINCT farmer FROM dispatch WHERE sent_date=? AND status='sent'", (day,))}
+    finally:
+        con.close()
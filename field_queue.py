@@ -0,0 +1,156 @@
+import sqlite3, json, time, uuid, threading
+
+try:
+    from postgrest.exceptions import APIError
+except ImportError:  # 수파베이스 클라이언트 없이 쓰는 경우 → 모든 오류를 재시도 대상으로
+    APIError = ()
+
+# ══════════════════════════════════════════
+# 현장 요청 서버측 대기열 (SQLite WAL)
+#  - 제출은 스트림릿 서버의 로컬 파일에 먼저 기록 → 폼은 바로 반환
+#  - 백그라운드 전송기가 staff_data 로 묶음 전송 (재시도 + 멱등키)
+#  - 수파베이스 staff_data 에 idempotency_key(text, unique) 컬럼 필요:
+#      alter table staff_data add column idempotency_key text unique;
+# ══════════════════════════════════════════
+QUEUE_DB      = "field_queue.db"
+QUEUE_TABLE   = "staff_data"
+BATCH_SIZE    = 50
+MAX_ATTEMPTS  = 8
+FLUSH_EVERY   = 5      # 초
+KEEP_SENT_SEC = 7 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS field_queue (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    idem_key    TEXT NOT NULL UNIQUE,
+    payload     TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    next_at     REAL NOT NULL DEFAULT 0,
+    last_error  TEXT NOT NULL DEFAULT '',
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_field_queue_status ON field_queue(status, next_at);
+"""
+
+_init_lock = threading.Lock()
+_inited = set()
+_wake = threading.Event()
+_flusher = None
+
+def _conn(path=QUEUE_DB):
+    con = sqlite3.connect(path, timeout=10, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    with _init_lock:
+        if path not in _inited:
+            con.executescript(_SCHEMA)
+            _inited.add(path)
+    return con
+
+def enqueue(row, path=QUEUE_DB):
+    key = str(uuid.uuid4())
+    con = _conn(path)
+    try:
+        con.execute("INSERT INTO field_queue(idem_key, payload, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(row, ensure_ascii=False), time.time()))
+    finally:
+        con.close()
+    _wake.set()
+    return key
+
+def counts(path=QUEUE_DB):
+    con = _conn(path)
+    try:
+        rows = con.execute("SELECT status, COUNT(*) FROM field_queue WHERE status != 'sent' GROUP BY status").fetchall()
+    finally:
+        con.close()
+    c = {"pending": 0, "failed": 0}
+    c.update(dict(rows))
+    return c
+
+def retry_failed(path=QUEUE_DB):
+    con = _conn(path)
+    try:
+        n = con.execute("UPDATE field_queue SET status='pending', attempts=0, next_at=0 WHERE status='failed'").rowcount
+    finally:
+        con.close()
+    _wake.set()
+    return n
+
+# 일시적인 오류: PostgREST 연결 문제, SQLSTATE 연결/자원/운영자/직렬화 계열, HTTP 5xx
+_TRANSIENT = ("PGRST000", "PGRST001", "PGRST002", "PGRST003", "08", "40", "53", "57")
+
+def _retryable(e):
+    """전송 오류(연결 끊김, 시간 초과, 5xx)만 재시도. 4xx·제약 위반은 행 자체 문제라 재시도해도 같음."""
+    if not isinstance(e, APIError): return True
+    code = str(e.code or "")
+    return code.startswith(_TRANSIENT) or (len(code) == 3 and code.startswith("5"))
+
+def _backoff(con, rows, now, err):
+    con.execute("BEGIN")
+    for rid, _, _, att in rows:
+        att += 1
+        if att >= MAX_ATTEMPTS:
+            con.execute("UPDATE field_queue SET status='failed', attempts=?, last_error=? WHERE id=?",
+                        (att, err, rid))
+        else:
+            con.execute("UPDATE field_queue SET attempts=?, next_at=?, last_error=? WHERE id=?",
+                        (att, now + min(2 ** att, 300), err, rid))
+    con.execute("COMMIT")
+
+def _send(client, con, rows, now):
+    """rows 를 한 번에 전송, 보낸 건수 반환. 행 때문에 거절되면 반씩 나눠 문제 행만 실패 처리."""
+    data = [{**json.loads(p), "idempotency_key": k} for _, k, p, _ in rows]
+    try:
+        # 멱등키 충돌(이미 들어간 행)은 무시 → 응답 유실 후 재전송해도 중복 없음
+        client.table(QUEUE_TABLE).upsert(data, on_conflict="idempotency_key", ignore_duplicates=True).execute()
+    except Exception as e:
+        err = str(e)[:500]
+        if _retryable(e):
+            _backoff(con, rows, now, err)
+            return 0
+        if len(rows) == 1:
+            con.execute("UPDATE field_queue SET status='failed', attempts=attempts+1, last_error=? WHERE id=?",
+                        (err, rows[0][0]))
+            return 0
+        mid = len(rows) // 2
+        return _send(client, con, rows[:mid], now) + _send(client, con, rows[mid:], now)
+    con.executemany("UPDATE field_queue SET status='sent', last_error='' WHERE id=?", [(r[0],) for r in rows])
+    return len(rows)
+
+def flush_once(client, path=QUEUE_DB, batch=BATCH_SIZE):
+    """대기 중인 요청을 한 묶음 전송. 전송 건수 반환."""
+    now = time.time()
+    con = _conn(path)
+    try:
+        rows = con.execute(
+            "SELECT id, idem_key, payload, attempts FROM field_queue "
+            "WHERE status='pending' AND next_at <= ? ORDER BY id LIMIT ?", (now, batch)
+        ).fetchall()
+        if not rows: return 0
+        n = _send(client, con, rows, now)
+        con.execute("DELETE FROM field_queue WHERE status='sent' AND created_at < ?", (now - KEEP_SENT_SEC,))
+        return n
+    finally:
+        con.close()
+
+def _loop(client, path):
+    while True:
+        try:
+            n = flush_once(client, path)
+        except Exception:
+            n = 0
+        if n: continue  # 남은 대기분이 있을 수 있으니 바로 다음 묶음
+        _wake.wait(FLUSH_EVERY)
+        _wake.clear()
+
+def start_flusher(client, path=QUEUE_DB):
+    """프로세스당 전송기 스레드 1개만 띄움 (재실행마다 호출해도 안전)."""
+    global _flusher
+    if client is None: return None
+    with _init_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_loop, args=(client, path), daemon=True, name="field-queue-flusher")
+            _flusher.start()
+    return _flusher
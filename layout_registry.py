@@ -0,0 +1,220 @@
+import pandas as pd
+import numpy as np
+import openpyxl
+import hashlib, json, os, threading, datetime
+
+import pipeline
+
+# ══════════════════════════════════════════
+# 넷포스 내보내기 양식 등록부
+#  - 헤더 행 지문 → 파싱 계획(헤더 위치, 열 역할, dtype) 을 디스크에 저장
+#  - 아는 양식은 필요한 열만 바로 읽음, 모르는 양식은 load_smart 로 읽고 등록
+# ══════════════════════════════════════════
+LAYOUT_FILE = "export_layouts.json"
+HEAD_ROWS   = 20
+
+ROLES = {
+    "sales":  ["item", "qty", "amt", "farmer", "spec", "date", "vat"],
+    "member": ["member_no", "phone"],
+    "info":   ["name", "phone", "email"],
+}
+REQUIRED   = {"sales": ["item", "amt"], "member": ["member_no", "phone"], "info": ["name", "phone"]}
+TEXT_ROLES = {"item", "farmer", "spec", "date", "member", "member_no", "phone", "name", "email"}
+
+_lock = threading.Lock()
+_plans = {}   # 경로 → {지문: 계획}
+
+def _norm(v):
+    return "" if pd.isna(v) else str(v).replace(" ", "").replace("\n", "")
+
+def fingerprint(row, ftype):
+    cells = [_norm(v) for v in row]
+    while cells and not cells[-1]: cells.pop()
+    return hashlib.sha1((ftype + "\x1f" + "\x1f".join(cells)).encode("utf-8")).hexdigest()[:16]
+
+def _resolve_roles(cols, ftype):
+    """열 이름 목록 → {역할: 열 이름} (기존 휴리스틱 그대로)."""
+    if ftype == "sales":
+        found = dict(zip(ROLES["sales"], pipeline.detect_cols(cols)))
+        c_date, c_farmer, c_item, c_member = pipeline.loyal_cols(cols)
+        found.update({"loyal_date": c_date, "loyal_farmer": c_farmer, "loyal_item": c_item, "member": c_member})
+    elif ftype == "member":
+        found = dict(zip(ROLES["member"], pipeline.member_cols(cols)))
+    else:
+        found = dict(zip(ROLES["info"], pipeline.info_cols(cols)))
+    return {r: c for r, c in found.items() if c}
+
+def _load_plans(path=LAYOUT_FILE):
+    if path not in _plans:
+        try:
+            with open(path, encoding="utf-8") as f: _plans[path] = json.load(f)
+        except (OSError, ValueError):
+            _plans[path] = {}
+    return _plans[path]
+
+def _save_plans(path=LAYOUT_FILE):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_plans[path], f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+def _seek0(f):
+    if hasattr(f, "seek"): f.seek(0)
+
+def _read_head(file_obj):
+    try:
+        return pd.read_excel(file_obj, header=None, nrows=HEAD_ROWS, engine="openpyxl"), "xlsx"
+    except Exception:
+        _seek0(file_obj)
+        return pd.read_csv(file_obj, header=None, nrows=HEAD_ROWS, encoding="utf-8"), "csv"
+
+def compile_plan(header_row, header_idx, ftype, fmt):
+    cols = [_norm(v) for v in header_row]
+    roles = _resolve_roles(cols, ftype)
+    names = list(dict.fromkeys(roles.values()))
+    text = {roles[r] for r in roles if r in TEXT_ROLES}
+    return {
+        "ftype": ftype, "fmt": fmt, "header_row": int(header_idx), "columns": cols,
+        "roles": roles, "usecols": [cols.index(n) for n in names], "names": names,
+        "dtypes": {n: "str" for n in names if n in text},
+        "registered": datetime.datetime.now().isoformat(timespec="seconds"), "hits": 0,
+    }
+
+def _xlsx_frame(rows, plan):
+    df = pd.DataFrame(rows, columns=plan["names"], dtype=object)
+    for n in plan["names"]:
+        conv = str if plan["dtypes"].get(n) == "str" else (lambda v: v)
+        df[n] = df[n].map(lambda v: np.nan if v is None else conv(v))
+    return df
+
+def _iter_xlsx(file_obj, plan, chunk_rows):
+    # openpyxl 읽기 전용 스트림에서 필요한 열까지만 (max_col) 셀을 꺼냄
+    pos = plan["usecols"]
+    wb = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()  # 넷포스 엑셀은 저장된 범위가 A1 뿐 → 그대로 믿으면 0행 (read_excel 도 이렇게 읽음)
+        buf = []
+        for r in ws.iter_rows(min_row=plan["header_row"] + 2, max_col=max(pos) + 1, values_only=True):
+            buf.append([r[p] if p < len(r) else None for p in pos])
+            if len(buf) >= chunk_rows:
+                # 끝쪽 빈 행은 파일 끝인지 알 수 없으니 다음 묶음으로 넘김
+                k = len(buf)
+                while k and all(v is None for v in buf[k - 1]): k -= 1
+                if k:
+                    yield _xlsx_frame(buf[:k], plan)
+                    buf = buf[k:]
+    finally:
+        wb.close()
+    while buf and all(v is None for v in buf[-1]): buf.pop()  # read_excel 처럼 끝 빈 행 제거
+    if buf: yield _xlsx_frame(buf, plan)
+
+def _read_xlsx(file_obj, plan):
+    chunks = list(_iter_xlsx(file_obj, plan, float("inf")))
+    return chunks[0] if chunks else _xlsx_frame([], plan)
+
+def _read_csv(file_obj, plan, **kw):
+    # header_row 는 빈 줄을 뺀 줄 번호 (_read_head / load_smart 기준) → skiprows(실제 줄 수) 대신 header= 로 건너뜀
+    pos = plan["usecols"]
+    dtype = {p: str for p, n in zip(pos, plan["names"]) if plan["dtypes"].get(n) == "str"}
+    return pd.read_csv(file_obj, header=plan["header_row"], index_col=False, usecols=pos, dtype=dtype,
+                       encoding="utf-8", **kw)
+
+def _named(df, plan):
+    # usecols 는 파일 순서로 나오므로 위치로 역할 이름을 붙이고 계획 순서로 정렬
+    by_pos = dict(zip(plan["usecols"], plan["names"]))
+    return df.set_axis([by_pos[p] for p in sorted(by_pos)], axis=1)[plan["names"]]
+
+def iter_with_plan(file_obj, plan, chunk_rows):
+    """read_with_plan 을 chunk_rows 행씩 나눠 읽기 (합치면 read_with_plan 과 같음)."""
+    _seek0(file_obj)
+    if plan["fmt"] == "xlsx":
+        yield from _iter_xlsx(file_obj, plan, chunk_rows)
+        return
+    with _read_csv(file_obj, plan, chunksize=chunk_rows) as reader:
+        for df in reader:
+            yield _named(df, plan)
+
+def read_with_plan(file_obj, plan):
+    """헤더 아래 행을 필요한 열만, 지정 dtype 으로 읽기."""
+    _seek0(file_obj)
+    if plan["fmt"] == "xlsx": return _read_xlsx(file_obj, plan)
+    return _named(_read_csv(file_obj, plan), plan)
+
+def _has_rows_below(head, plan):
+    return bool(head.iloc[plan["header_row"] + 1:].notna().to_numpy().any())
+
+def _find_plan(head, ftype, fmt, path):
+    with _lock:
+        plans = _load_plans(path)
+        for i in range(len(head)):
+            plan = plans.get(fingerprint(head.iloc[i], ftype))
+            if plan and plan["header_row"] == i and plan["fmt"] == fmt:
+                return plan
+    return None
+
+def _compile(head, ftype, fmt):
+    """앞부분으로 계획을 만들되, 필수 열을 찾고 헤더 아래에 행이 보일 때만 (아니면 None)."""
+    tgt = pipeline.find_header(head, ftype)
+    if tgt == -1: return None
+    plan = compile_plan(head.iloc[tgt], tgt, ftype, fmt)
+    if not all(r in plan["roles"] for r in REQUIRED[ftype]) or not _has_rows_below(head, plan): return None
+    return plan
+
+def _save_plan(head, plan, path):
+    with _lock:
+        _load_plans(path)[fingerprint(head.iloc[plan["header_row"]], plan["ftype"])] = plan
+        try: _save_plans(path)
+        except OSError: pass
+
+def load(file_obj, ftype="sales", path=LAYOUT_FILE):
+    """load_smart 와 같은 (df, 오류) 반환. 등록된 양식이면 빠른 경로."""
+    if file_obj is None: return None, "없음"
+    try:
+        head, fmt = _read_head(file_obj)
+    except Exception:
+        _seek0(file_obj)
+        return pipeline.load_smart(file_obj, ftype)
+
+    plan = _find_plan(head, ftype, fmt, path)
+    if plan:
+        try:
+            df = read_with_plan(file_obj, plan)
+            # 앞부분에 헤더 아래 행이 보였는데 0행이면 계획이 파일과 안 맞는 것 → 휴리스틱으로
+            if len(df) or not _has_rows_below(head, plan):
+                with _lock: plan["hits"] += 1
+                return df, None
+        except Exception:
+            pass  # 파일이 계획과 다르면 휴리스틱으로
+
+    # 모르는 양식 → 기존 휴리스틱, 제대로 읽혔을 때만 등록 (잘못된 계획이 디스크에 남지 않게)
+    _seek0(file_obj)
+    df, err = pipeline.load_smart(file_obj, ftype)
+    if err is None and df is not None and len(df):
+        new = _compile(head, ftype, fmt)
+        if new: _save_plan(head, new, path)
+    return df, err
+
+def iter_chunks(file_obj, ftype="sales", chunk_rows=50000, path=LAYOUT_FILE):
+    """파일 전체를 올리지 않고 chunk_rows 행씩 DataFrame 을 내줌 (대용량 판매 파일용).
+    모르는 양식은 앞부분으로 계획을 만들어 읽고 행이 나오면 등록, 헤더를 못 찾으면 load 결과 하나를 통째로."""
+    if file_obj is None: return
+    new = None
+    try:
+        head, fmt = _read_head(file_obj)
+        plan = _find_plan(head, ftype, fmt, path) or (new := _compile(head, ftype, fmt))
+    except Exception:
+        plan = None
+    if plan:
+        if not new:
+            with _lock: plan["hits"] += 1
+        n = 0
+        for df in iter_with_plan(file_obj, plan, chunk_rows):
+            n += len(df)
+            yield df
+        if n and new: _save_plan(head, new, path)
+        # 앞부분에 헤더 아래 행이 보였는데 한 행도 못 읽었으면 계획이 파일과 안 맞는 것 → 통째로 읽기
+        if n or not _has_rows_below(head, plan): return
+    _seek0(file_obj)
+    df, _ = load(file_obj, ftype, path)
+    if df is not None: yield df
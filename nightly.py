@@ -0,0 +1,94 @@
+import argparse, datetime, glob, os, subprocess, sys, time
+
+import pandas as pd
+
+import pipeline
+import layout_registry
+import snapshot
+
+# ══════════════════════════════════════════
+# 야간 발주 분석 (화면 없이 실행)
+#  python nightly.py --fetch                          # 넷포스 봇 → 봇이 받은 파일 분석
+#  python nightly.py --sales 판매1.xlsx 판매2.xlsx     # 파일 지정
+#  cron 예: 30 5 * * *  cd /srv/sida && python nightly.py --fetch
+#  봇 다운로드 폴더는 NETFORCE_DOWNLOAD_DIR (기본: 브라우저 기본값 ~/Downloads)
+# ══════════════════════════════════════════
+SERVER_CONTACT_FILE = "농가관리 목록_20260208 (전체).xlsx"
+PERIODS        = (1, 3, 7, 14)   # 📦 발주 탭 집계기간 선택지
+DEFAULT_PERIOD = 7
+DEFAULT_SAFETY = 1.1
+DEFAULT_BUDGET = 30000000
+BOT_DOWNLOAD_DIR = os.environ.get("NETFORCE_DOWNLOAD_DIR", os.path.join(os.path.expanduser("~"), "Downloads"))
+
+def newest_exports(inbox, n=1, since=0):
+    files = [f for ext in ("xlsx", "csv") for f in glob.glob(os.path.join(inbox, f"*.{ext}"))]
+    return sorted((f for f in files if os.path.getmtime(f) >= since), key=os.path.getmtime)[-n:]
+
+def fetch(days, inbox=BOT_DOWNLOAD_DIR):
+    """netforce.py 실행 후 이번에 받은 파일 경로 반환 (없으면 중단 → 예전 파일로 분석하지 않음)."""
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=days)
+    t0 = time.time()
+    subprocess.run([sys.executable, "netforce.py", start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")],
+                   capture_output=True, text=True, check=True)
+    paths = newest_exports(inbox, 1, since=t0 - 1)
+    if not paths: raise SystemExit(f"넷포스 봇이 받은 파일을 {inbox} 에서 찾지 못했습니다.")
+    return paths
+
+def _load_optional(path, fn):
+    if not path or not os.path.exists(path): return None
+    try: return fn(path)
+    except Exception: return None
+
+def compute(sales_paths, contact=SERVER_CONTACT_FILE, safety=DEFAULT_SAFETY, now=None):
+    """📦 발주 탭과 같은 파이프라인으로 스냅샷 데이터 생성."""
+    now = now or pd.Timestamp.now()
+    parts = [d for d, _ in (layout_registry.load(p, "sales") for p in sales_paths) if d is not None]
+    if not parts: raise SystemExit("판매 파일을 읽지 못했습니다.")
+    df_s = pd.concat(parts, ignore_index=True)
+    cols = pipeline.detect_cols(df_s.columns.tolist())
+    if not (cols[0] and cols[2]): raise SystemExit("상품/금액 열을 찾지 못했습니다.")
+
+    phone_map = _load_optional(contact, lambda p: pipeline.load_phone_map(p, layout_registry.load))
+    phone_map = pd.DataFrame() if phone_map is None else phone_map
+
+    # 가장 긴 기간으로 한 번만 정규화하고 짧은 기간은 날짜로 잘라 씀 (파생 열은 행 단위라 결과 동일)
+    df_t = pipeline.normalize_sales(df_s.copy(), cols, max(PERIODS), now)
+    aggs = {}
+    for p in PERIODS:
+        sub = df_t[df_t["__date"] >= now - pd.Timedelta(days=p)] if "__date" in df_t else df_t
+        aggs[p] = pipeline.aggregate_sales(sub.copy(), cols, phone_map, safety, p)
+
+    agg_sorted, _ = pipeline.prioritize(aggs[DEFAULT_PERIOD].copy(), DEFAULT_BUDGET, set())
+    lines = {f: e["lines"] for f, e in pipeline.order_book(agg_sorted)["farmers"].items()}
+
+    data = {"aggs": aggs, "lines": lines}
+    meta = {
+        "created": now.isoformat(timespec="seconds"), "sources": [os.path.basename(p) for p in sales_paths],
+        "rows": len(df_s), "periods": list(PERIODS), "lines_period": DEFAULT_PERIOD, "safety": safety,
+        "farmers": len(lines),
+    }
+    return data, meta
+
+def main():
+    ap = argparse.ArgumentParser(description="야간 발주 분석 → 스냅샷")
+    ap.add_argument("--sales", nargs="*", default=[], help="판매 실적 파일")
+    ap.add_argument("--inbox", default=BOT_DOWNLOAD_DIR, help="넷포스 다운로드 폴더 (가장 최근 파일 사용)")
+    ap.add_argument("--latest", type=int, default=1, help="--inbox 에서 쓸 최근 파일 수")
+    ap.add_argument("--fetch", action="store_true", help="먼저 netforce.py 로 내려받기")
+    ap.add_argument("--days", type=int, default=max(PERIODS), help="--fetch 조회 일수")
+    ap.add_argument("--safety", type=float, default=DEFAULT_SAFETY)
+    ap.add_argument("--out", default=snapshot.SNAPSHOT_DIR)
+    ap.add_argument("--keep", type=int, default=7)
+    a = ap.parse_args()
+
+    t0 = time.perf_counter()
+    paths = a.sales or (fetch(a.days, a.inbox) if a.fetch else newest_exports(a.inbox, a.latest))
+    if not paths: raise SystemExit("분석할 판매 파일이 없습니다. --sales 또는 --inbox 를 지정하세요.")
+    data, meta = compute(paths, safety=a.safety)
+    ver = snapshot.save(data, meta, a.out, a.keep)
+    print(f"✅ 스냅샷 {ver}: 판매 {meta['rows']:,}행, 농가 {meta['farmers']}곳 "
+          f"({time.perf_counter() - t0:.1f}초)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import hashlib
+
+# ══════════════════════════════════════════
+# 서버 측 페이지 표
+#  - 전체 프레임은 서버에 두고 정렬/필터/검색 후 보이는 페이지만 브라우저로 전송
+#  - 정렬 키·방향별 순서는 캐시해 두고 필터는 그 순서 위에서 마스크만 적용
+#  - 캐시 키는 프레임 전체 내용 해시 (st.cache_data 는 큰 프레임을 일부 행만 보고 해시함)
+# ══════════════════════════════════════════
+def _version(df):
+    try: h = pd.util.hash_pandas_object(df, index=False)
+    except TypeError: h = pd.util.hash_pandas_object(df.astype(str), index=False)
+    return hashlib.sha1(h.to_numpy().tobytes() + repr(df.columns.tolist()).encode()).hexdigest()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _sort_index(_df, version, col, ascending):
+    # 방향별로 따로 정렬 → 내림차순에서도 빈 값은 맨 뒤, 같은 값은 원래 순서 유지
+    s = _df[col].reset_index(drop=True)
+    try:
+        s = s.sort_values(ascending=ascending, na_position="last", kind="stable")
+    except TypeError:
+        s = s.mask(s.notna(), s.astype(str)).sort_values(ascending=ascending, na_position="last", kind="stable")
+    return s.index.to_numpy()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _search_blob(_df, version, cols):
+    return _df[list(cols)].astype(str).agg(" ".join, axis=1).str.lower()
+
+def _same(a, b):
+    return (pd.isna(a) and pd.isna(b)) if (pd.isna(a) or pd.isna(b)) else a == b
+
+def _select(df, key, sort_cols, search_cols, filter_cols, sort_keys=None):
+    """정렬/필터/검색 UI를 그리고 조건에 맞는 행 위치(정렬 순)를 반환. sort_keys={표시 열: 정렬용 열}."""
+    ver = _version(df)
+    n_ctrl = 1 + bool(sort_cols) + len(filter_cols)
+    ctrl = st.columns([2] + [1] * (n_ctrl - 1)) if n_ctrl > 1 else [st.container()]
+    q = ctrl[0].text_input("검색", key=f"{key}__q", placeholder="🔍 검색", label_visibility="collapsed")
+
+    mask = np.ones(len(df), dtype=bool)
+    if q and search_cols:
+        mask &= _search_blob(df, ver, tuple(search_cols)).str.contains(q.strip().lower(), regex=False).to_numpy()
+    for i, c in enumerate(filter_cols):
+        opts = sorted(df[c].dropna().astype(str).unique().tolist())
+        sel = ctrl[1 + bool(sort_cols) + i].multiselect(c, opts, key=f"{key}__f_{c}", placeholder=c, label_visibility="collapsed")
+        if sel: mask &= df[c].astype(str).isin(sel).to_numpy()
+
+    if sort_cols:
+        opts = [f"{c} ↓" for c in sort_cols] + [f"{c} ↑" for c in sort_cols]
+        sel = ctrl[1].selectbox("정렬", opts, key=f"{key}__s", label_visibility="collapsed")
+        order = _sort_index(df, ver, (sort_keys or {}).get(sel[:-2], sel[:-2]), sel.endswith("↑"))
+        return order[mask[order]]
+    return np.flatnonzero(mask)
+
+def _pager(key, total, page_size):
+    last = max((total - 1) // page_size, 0)
+    pk = f"{key}__page"
+    page = min(st.session_state.get(pk, 0), last)
+    if last > 0:
+        p1, p2, p3 = st.columns([1, 3, 1])
+        if p1.button("◀ 이전", key=f"{key}__prev", disabled=page == 0, use_container_width=True): page -= 1
+        if p3.button("다음 ▶", key=f"{key}__next", disabled=page >= last, use_container_width=True): page += 1
+        p2.caption(f"{page + 1} / {last + 1} 쪽 · 총 {total:,}건")
+    st.session_state[pk] = page
+    return page
+
+def paged_table(df, key, columns=None, sort_cols=(), search_cols=None, filter_cols=(), page_size=20, **kw):
+    """st.dataframe 대신 사용. 현재 페이지만 전송."""
+    if columns is not None: df = df[list(columns)]
+    df = df.reset_index(drop=True)
+    pos = _select(df, key, list(sort_cols), search_cols if search_cols is not None else df.columns.tolist(), list(filter_cols))
+    page = _pager(key, len(pos), page_size)
+    view = df.iloc[pos[page * page_size:(page + 1) * page_size]]
+    st.dataframe(view, hide_index=True, use_container_width=True, **kw)
+    return view
+
+def paged_editor(df, key, columns, id_col="id", sort_cols=(), search_cols=None, filter_cols=(), page_size=20, sort_keys=None, **kw):
+    """st.data_editor 페이지 버전. 수정 내용은 id 기준으로 세션에 모아 {id: {열: 값}} 으로 반환.
+    sort_keys={표시 열: 숨은 정렬용 열} 이면 표시 문자열 대신 그 열로 정렬."""
+    ek = f"{key}__edits"
+    edits = st.session_state.setdefault(ek, {})
+    cols = list(dict.fromkeys(list(columns) + [id_col]))
+    hidden = [c for c in dict.fromkeys((sort_keys or {}).values()) if c not in cols]
+    df = df[cols + hidden].reset_index(drop=True)
+    pos = _select(df, key, list(sort_cols), search_cols if search_cols is not None else [c for c in columns if c != id_col], list(filter_cols), sort_keys)
+    df = df[cols]
+    page = _pager(key, len(pos), page_size)
+    orig = df.iloc[pos[page * page_size:(page + 1) * page_size]]
+    view = orig.copy()
+
+    # 다른 페이지에서 했던 수정 복원
+    for rid, ch in edits.items():
+        hit = view[id_col] == rid
+        if hit.any():
+            for c, v in ch.items(): view.loc[hit, c] = v
+
+    # 페이지 구성(id)이 바뀌면 편집기 상태도 새로 시작 → 행 위치로 잘못 매핑되지 않음
+    ed_key = f"{key}__ed_{hash(tuple(view[id_col].tolist()))}"
+    edited = st.data_editor(view, key=ed_key, hide_index=True, use_container_width=True, **kw)
+
+    base = orig.set_index(id_col)
+    for _, r in edited.iterrows():
+        rid = r[id_col]
+        ch = {c: r[c] for c in columns if c != id_col and not _same(r[c], base.at[rid, c])}
+        if ch: edits[rid] = ch
+        else: edits.pop(rid, None)
+    return edits
+
+def clear_edits(key):
+    st.session_state.pop(f"{key}__edits", None)
@@ -1,12 +1,24 @@
 import streamlit as st
+import datetime
 from supabase import create_client, Client
+import field_queue
 
-# 1. 수파베이스 연결 설정 (스트림릿 금고에서 열쇠 가져오기)
-url: str = st.secrets["supabase"]["url"]
-key: str = st.secrets["supabase"]["key"]
-supabase: Client = create_client(url, key)
+# 1. 수파베이스 연결 설정 (스트림릿 금고에서 열쇠 가져오기) - 프로세스당 1회
+@st.cache_resource
+def get_client() -> Client:
+    url: str = st.secrets["supabase"]["url"]
+    key: str = st.secrets["supabase"]["key"]
+    return create_client(url, key)
+
+try:
+    supabase = get_client()
+except Exception:
+    supabase = None
+flusher = field_queue.start_flusher(supabase)
 
 st.title("📝 현장 요청 입력 (수파베이스 연동)")
+if flusher is None:
+    st.warning("⚠️ 수파베이스 연결 설정이 없어 요청은 서버 대기열에만 저장됩니다. 연결이 설정되면 그때 전송됩니다.")
 
 # 2. 직원용 입력 폼
 with st.form("request_form", clear_on_submit=True):
@@ -18,15 +30,23 @@ with st.form("request_form", clear_on_submit=True):
     submitted = st.form_submit_button("요청 추가")
 
     if submitted:
-        # 3. 수파베이스 'staff_data' 표에 데이터 전송
+        # 3. 서버 대기열에 먼저 저장 → 백그라운드에서 'staff_data' 로 전송
+        #    (접수시간은 제출 시각으로 고정 → 전송이 늦어져도 그대로)
         try:
-            data, count = supabase.table("staff_data").insert({
+            field_queue.enqueue({
                 "item_name": item_name,
                 "farmer_name": farmer_name,
                 "urgency": urgency,
-                "content": content
-            }).execute()
-            
-            st.success("✅ 현장 요청이 수파베이스에 성공적으로 저장되었습니다!")
+                "content": content,
+                "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+            })
+            if flusher is not None:
+                st.success("✅ 현장 요청이 서버에 접수되었습니다! (수파베이스가 잠시 응답하지 않아도 자동으로 다시 전송됩니다)")
+            else:
+                st.warning("💾 현장 요청을 서버 대기열에 저장했습니다. 수파베이스 연결이 설정될 때까지 전송되지 않습니다.")
         except Exception as e:
             st.error(f"❌ 오류가 발생했습니다: {e}")
+
+q = field_queue.counts()
+if q["pending"]: st.caption(f"⏳ 전송 대기 {q['pending']}건")
+if q["failed"]: st.caption(f"⚠️ 전송 실패 {q['failed']}건 (메인 대시보드에서 재시도)")
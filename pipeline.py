@@ -0,0 +1,460 @@
+import pandas as pd
+import numpy as np
+import io, re
+
+# ══════════════════════════════════════════
+# 분석 파이프라인 (스트림릿 비의존)
+#  - app.py 탭, 벤치마크, 야간 작업이 같은 코드를 사용
+# ══════════════════════════════════════════
+VALID_SUPPLIERS = [
+    "(주)가보트레이딩","(주)열두달","(주)우리밀","(주)윈윈농수산","(주)유기샘",
+    "(주)케이푸드","(주)한누리","G1상사","mk코리아","가가호영어조합법인",
+    "고삼농협","금강향수","나우푸드","네니아","농부생각","농업회사법인(주)담채원",
+    "당암tf","더테스트키친","도마령영농조합법인","두레생협","또또푸드","로엘팩토리",
+    "맛가마","산백유통","새롬식품","생수콩나물영농조합법인","슈가랩","씨글로벌(아라찬)",
+    "씨에이치하모니","언니들공방","에르코스","엔젤농장","우리밀농협","우신영농조합",
+    "유기농산","유안컴퍼니","인터뷰베이커리","자연에찬","장수이야기","제로웨이스트존",
+    "청양농협조합","청오건강농업회사법인","청춘농장","코레드인터내쇼날","태경F&B",
+    "토종마을","폴카닷(이은경)","하대목장","한산항아리소곡주","함지박(주)","행복우리식품영농조합"
+]
+VALID_SET = {v.replace(" ", "") for v in VALID_SUPPLIERS}
+
+# ══════════════════════════════════════════
+# 유틸 함수
+# ══════════════════════════════════════════
+def clean_phone(phone):
+    if pd.isna(phone) or str(phone).strip() in ["-", "", "nan"]: return ""
+    n = re.sub(r"[^0-9]", "", str(phone))
+    if n.startswith("10") and len(n) >= 10: n = "0" + n
+    return n
+
+def find_header(df_raw, ftype="sales"):
+    """앞 20행에서 키워드가 2개 이상 있는 행 중 채워진 칸이 가장 많은 행 = 헤더. 없으면 -1.
+    (농가관리 목록은 위쪽 조회조건 행에도 '농가명 … 휴대전화번호' 가 있음)"""
+    kws = (["농가","공급자","생산자","상품","품목"] if ftype == "sales"
+           else ["회원번호","이름","휴대전화"] if ftype == "member"
+           else ["농가명","휴대전화"])
+    best, best_n = -1, 0
+    for idx, row in df_raw.head(20).iterrows():
+        if sum(1 for k in kws if k in row.astype(str).str.cat(sep=" ")) >= 2:
+            n = int(row.notna().sum())
+            if n > best_n: best, best_n = idx, n
+    return best
+
+def load_smart(file_obj, ftype="sales"):
+    if file_obj is None: return None, "없음"
+    df_raw = None
+    try:
+        df_raw = pd.read_excel(file_obj, header=None, engine="openpyxl")
+    except:
+        try:
+            if hasattr(file_obj, "seek"): file_obj.seek(0)
+            df_raw = pd.read_csv(file_obj, header=None, encoding="utf-8")
+        except:
+            return None, "읽기 실패"
+
+    tgt = find_header(df_raw, ftype)
+    if tgt != -1:
+        df = df_raw.iloc[tgt+1:].copy()
+        df.columns = df_raw.iloc[tgt]
+        df.columns = df.columns.astype(str).str.replace(" ", "").str.replace("\n", "")
+        return df.loc[:, ~df.columns.str.contains("^Unnamed")], None
+    try:
+        if hasattr(file_obj, "seek"): file_obj.seek(0)
+        return (pd.read_excel(file_obj) if (hasattr(file_obj, "name") and
+                file_obj.name.endswith("xlsx")) else pd.read_csv(file_obj)), "헤더 못 찾음"
+    except:
+        return df_raw, "헤더 못 찾음"
+
+def to_num(x):
+    try:
+        s = re.sub(r"[^0-9.-]", "", str(x))
+        return float(s) if s not in ["", "."] else 0
+    except:
+        return 0
+
+def detect_cols(cols):
+    excl = ["할인","반품","취소","면세","과세","부가세"]
+    s_item   = next((c for c in cols if any(x in c for x in ["상품","품목"])), None)
+    s_qty    = next((c for c in cols if any(x in c for x in ["판매수량","수량","개수"])), None)
+    cands    = ([c for c in cols if ("총" in c and ("판매" in c or "매출" in c))] +
+                [c for c in cols if (("판매" in c or "매출" in c) and ("액" in c or "금액" in c))] +
+                [c for c in cols if "금액" in c])
+    s_amt    = next((c for c in cands if not any(b in c for b in excl)), None)
+    s_farmer = next((c for c in cols if any(x in c for x in ["공급자","농가","생산자","거래처"])), None)
+    s_spec   = next((c for c in cols if any(x in c for x in ["규격","단위","중량","용량"])), None)
+    s_date   = next((c for c in cols if any(x in c for x in ["일시","날짜","date","Date"])), None)
+    s_vat    = next((c for c in cols if any(x in c for x in ["부가세","세액","VAT"])), None)
+    return s_item, s_qty, s_amt, s_farmer, s_spec, s_date, s_vat
+
+def to_excel(df):
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as w:
+        df.to_excel(w, index=False)
+    return buf.getvalue()
+
+def ext_kg(text):
+    text = str(text).lower().replace(" ", "")
+    m = re.search(r"([\d\.]+)(kg)", text)
+    if m:
+        try: return float(m.group(1))
+        except: pass
+    m = re.search(r"([\d\.]+)(g)", text)
+    if m:
+        try: return float(m.group(1)) / 1000
+        except: pass
+    return 0.0
+
+def info_cols(cols):
+    i_name  = next((c for c in cols if "농가명" in c), None)
+    i_phone = next((c for c in cols if "휴대전화" in c or "전화" in c), None)
+    i_email = next((c for c in cols if "이메일" in c or "email" in c.lower()), None)
+    return i_name, i_phone, i_email
+
+def member_cols(cols):
+    m_no = next((c for c in cols if "회원번호" in c), None)
+    m_ph = next((c for c in cols if "휴대전화" in c), None)
+    return m_no, m_ph
+
+def load_phone_map(file_obj, load=load_smart):
+    """농가관리 목록 → clean_farmer / clean_phone / clean_email 표."""
+    df_ci, _ = load(file_obj, "info")
+    if df_ci is None: return pd.DataFrame()
+    i_name, i_phone, i_email = info_cols(df_ci.columns)
+    if not (i_name and i_phone): return pd.DataFrame()
+    df_ci["clean_farmer"]  = df_ci[i_name].astype(str).str.replace(" ", "")
+    df_ci["clean_phone"] = df_ci[i_phone].apply(clean_phone)
+    df_ci["clean_email"] = df_ci[i_email].astype(str) if i_email else ""
+    return df_ci.drop_duplicates(subset=["clean_farmer"])[["clean_farmer", "clean_phone", "clean_email"]]
+
+# ══════════════════════════════════════════
+# 📦 발주 분석
+# ══════════════════════════════════════════
+def norm_name(name):
+    n = str(name).replace(" ", "")
+    if "지족" in n and "야채" in n: return "지족점야채"
+    if "지족" in n and "과일" in n: return "지족점과일"
+    if "지족" in n and "정육" in n: return "지족점정육"
+    if "지족" in n and "공동" in n: return "지족점_공동구매"
+    if "지족" in n and "매장" in n: return "지족매장"
+    return re.sub(r"\(?벌크\)?", "", n)
+
+def disp_name(x):
+    s = str(x).replace("*", "")
+    return re.sub(r"\(\s*[\d\.]+\s*(?:g|kg|G|KG)\s*\)", "", s).replace("()", "").strip().replace(" ", "")
+
+def parent_name(x):
+    s = str(x).replace("*", "")
+    s = re.sub(r"\(?벌크\)?", "", s)
+    s = re.sub(r"\(?bulk\)?", "", s, flags=re.IGNORECASE)
+    return re.sub(r"\(\s*[\d\.]+\s*(?:g|kg|G|KG)\s*\)", "", s).replace("()", "").strip().replace(" ", "")
+
+def classify(name):
+    c = name.replace(" ", "")
+    if "지족(Y)" in name or "지족(y)" in name: return "제외"
+    if "지족" in c: return "지족(사입)"
+    elif c in VALID_SET: return "일반업체"
+    else: return "일반업체"
+
+def normalize_sales(df_s, cols, period_days, now=None):
+    """업로드 원본 → 발주 집계용 행 (정규화/기간 필터/파생 열)."""
+    s_item, s_qty, s_amt, s_farmer, s_spec, s_date, s_vat = cols
+    if s_farmer:
+        df_s["clean_farmer"] = df_s[s_farmer].apply(norm_name)
+        df_s[s_farmer] = df_s["clean_farmer"]
+        df_s["구분"] = df_s["clean_farmer"].apply(classify)
+        df_t = df_s[df_s["구분"] != "제외"].copy()
+    else:
+        df_t = df_s.copy()
+        df_t["구분"] = "일반업체"
+        df_t["clean_farmer"] = df_t[s_item].apply(norm_name)
+
+    df_t[s_qty] = df_t[s_qty].apply(to_num) if s_qty else 1
+    df_t[s_amt] = df_t[s_amt].apply(to_num)
+    df_t.loc[(df_t[s_qty] <= 0) & (df_t[s_amt] > 0), s_qty] = 1
+
+    if s_vat:
+        df_t[s_vat] = df_t[s_vat].apply(to_num)
+        df_t["과세구분"] = np.where(df_t[s_vat] > 0, "과세", "비과세")
+    else:
+        df_t["과세구분"] = "비과세"
+
+    if s_date:
+        df_t["__date"] = pd.to_datetime(df_t[s_date], errors="coerce")
+        cutoff = (now or pd.Timestamp.now()) - pd.Timedelta(days=period_days)
+        df_t = df_t[df_t["__date"] >= cutoff]
+
+    df_t["__disp"]   = df_t[s_item].apply(disp_name)
+    df_t["__parent"] = df_t[s_item].apply(parent_name)
+    specs = df_t[s_spec] if s_spec in df_t.columns else [""] * len(df_t)
+    df_t["__unit_kg"]  = [ext_kg(sp) or ext_kg(it) for sp, it in zip(specs, df_t[s_item])]
+    df_t["__total_kg"] = df_t["__unit_kg"] * df_t[s_qty]
+    return df_t
+
+SALES_KEYS = ["__farmer", "__disp", "구분", "__parent", "과세구분"]
+PART_KEYS  = SALES_KEYS + ["__unit_kg"]
+
+def partial_sales(df_t, cols):
+    """정규화된 행 → 농가 × 상품 × 과세 × 단위중량 부분합 (열 이름은 파일과 무관하게 통일).
+    중량은 단위중량 × 수량합으로 마지막에 계산 → 나눠 합쳐도 소수 오차 없이 같은 값."""
+    s_item, s_qty, s_amt, s_farmer = cols[:4]
+    farmer_col = s_farmer if s_farmer else "clean_farmer"
+    part = df_t.groupby([farmer_col, "__disp", "구분", "__parent", "과세구분", "__unit_kg"]).agg(
+        {s_qty: "sum", s_amt: "sum"}
+    ).reset_index()
+    part.columns = PART_KEYS + ["__qty", "__amt"]
+    return part
+
+def merge_partials(parts, keys):
+    """부분합 여러 개 → 키별 합계 하나."""
+    if len(parts) == 1: return parts[0]
+    return pd.concat(parts, ignore_index=True).groupby(keys).sum().reset_index()
+
+def finish_sales(part, df_phone_map, safety, period_days):
+    """부분합 → 연락처 + 발주 수량/중량을 붙인 최종 집계."""
+    part["__total_kg"] = part["__unit_kg"] * part["__qty"]
+    agg = part.groupby(SALES_KEYS).agg({"__qty": "sum", "__amt": "sum", "__total_kg": "sum"}).reset_index()
+
+    if not df_phone_map.empty:
+        agg["clean_farmer"] = agg["__farmer"].astype(str).str.replace(" ", "")
+        agg = pd.merge(agg, df_phone_map, on="clean_farmer", how="left")
+    else:
+        agg["clean_phone"] = ""
+        agg["clean_email"] = ""
+
+    agg.rename(columns={"__farmer": "업체명", "__disp": "상품명", "__qty": "판매량", "__amt": "총판매액"}, inplace=True)
+    agg = agg[agg["총판매액"] > 0].sort_values(["업체명", "__parent", "상품명"])
+
+    return apply_safety(agg, safety, period_days)
+
+def aggregate_sales(df_t, cols, df_phone_map, safety, period_days):
+    """농가 × 상품 × 과세 집계 + 연락처 + 발주 수량/중량."""
+    return finish_sales(partial_sales(df_t, cols), df_phone_map, safety, period_days)
+
+def aggregate_sales_chunks(chunks, df_phone_map, safety, period_days, now=None, compact_rows=200000):
+    """행 묶음 단위 집계 (대용량 파일). 묶음마다 정규화 → 부분합 → 합치기.
+    aggregate_sales 와 같은 표를 만들고, 메모리는 묶음 크기 + 부분합 크기만 사용. 필수 열이 없으면 None."""
+    now = now or pd.Timestamp.now()
+    parts, n = [], 0
+    for chunk in chunks:
+        cols = detect_cols(chunk.columns.tolist())
+        if not (cols[0] and cols[2]): continue
+        df_t = normalize_sales(chunk, cols, period_days, now)
+        if df_t.empty: continue
+        parts.append(partial_sales(df_t, cols))
+        n += len(parts[-1])
+        if n > compact_rows:
+            parts = [merge_partials(parts, PART_KEYS)]
+            n = len(parts[0])
+    if not parts: return None
+    return finish_sales(merge_partials(parts, PART_KEYS), df_phone_map, safety, period_days)
+
+def apply_safety(agg, safety, period_days):
+    """일 평균 판매 × 안전계수 → 발주 수량/중량 (안전계수만 바뀌면 이것만 다시 계산)."""
+    agg["발주_수량"] = np.ceil(agg["판매량"] * safety / period_days)
+    agg["발주_중량"] = np.ceil(agg["__total_kg"] * safety / period_days)
+    return agg
+
+def urgent_items_from(field_reqs_df):
+    urgent_items = set()
+    if not field_reqs_df.empty:
+        for _, req in field_reqs_df.iterrows():
+            if req.get("긴급도", "") == "🔴 오늘 필요":
+                urgent_items.add(str(req.get("품목명", "")).replace(" ", ""))
+    return urgent_items
+
+def prioritize(agg, budget, urgent_items):
+    """예산 누적 기준 발주상태 부여. (agg_sorted, 예산 내 예상 발주액) 반환."""
+    farmer_est = agg.groupby("업체명")["총판매액"].sum() * 0.7
+    farmer_est_df = farmer_est.reset_index()
+    farmer_est_df.columns = ["업체명", "예상발주액_업체합계"]
+    agg = pd.merge(agg, farmer_est_df, on="업체명", how="left")
+    agg["예상발주액"] = agg["총판매액"] * 0.7
+
+    def calc_priority(row):
+        score = row["총판매액"] * 0.7
+        if row["상품명"].replace(" ", "") in urgent_items: score *= 3
+        return score
+
+    agg["우선순위점수"] = agg.apply(calc_priority, axis=1)
+    agg_sorted = agg.sort_values("우선순위점수", ascending=False).copy()
+    agg_sorted["누적발주액"] = agg_sorted["예상발주액"].cumsum()
+    agg_sorted["예산내"] = agg_sorted["누적발주액"] <= budget
+
+    def priority_label(row):
+        if row["상품명"].replace(" ", "") in urgent_items: return "🔴 긴급"
+        if row["예산내"]: return "🟢 권장"
+        return "⚪ 여유"
+
+    agg_sorted["발주상태"] = agg_sorted.apply(priority_label, axis=1)
+    est_total = agg_sorted[agg_sorted["예산내"]]["예상발주액"].sum()
+    return agg_sorted, est_total
+
+def build_order(df_s, period_days, safety, budget, df_phone_map=None, field_reqs_df=None, now=None):
+    """📦 발주 탭 전체 분석. 필수 열이 없으면 (None, 0)."""
+    cols = detect_cols(df_s.columns.tolist())
+    if not (cols[0] and cols[2]): return None, 0
+    df_t = normalize_sales(df_s, cols, period_days, now)
+    agg = aggregate_sales(df_t, cols, pd.DataFrame() if df_phone_map is None else df_phone_map, safety, period_days)
+    urgent = urgent_items_from(pd.DataFrame() if field_reqs_df is None else field_reqs_df)
+    return prioritize(agg, budget, urgent)
+
+def build_order_chunks(chunks, period_days, safety, budget, df_phone_map=None, field_reqs_df=None, now=None):
+    """build_order 의 나눠 읽기 판. chunks 는 판매 DataFrame 묶음의 반복자."""
+    agg = aggregate_sales_chunks(chunks, pd.DataFrame() if df_phone_map is None else df_phone_map, safety, period_days, now)
+    if agg is None: return None, 0
+    urgent = urgent_items_from(pd.DataFrame() if field_reqs_df is None else field_reqs_df)
+    return prioritize(agg, budget, urgent)
+
+# ══════════════════════════════════════════
+# 📤 발주 발송
+# ══════════════════════════════════════════
+MIXED_TAX = "혼합(과세+비과세)"
+
+def split_balju(agg_all):
+    """(지족 사입, 농가 발주 대상 + 농가_과세유형) 로 분리."""
+    df_saip = agg_all[agg_all["구분"] == "지족(사입)"]
+    df_balju = agg_all[agg_all["구분"] == "일반업체"]
+    farmer_tax_types = df_balju.groupby("업체명")["과세구분"].unique().apply(
+        lambda x: MIXED_TAX if len(x) > 1 else (x[0] + " 전용")
+    ).reset_index(name="농가_과세유형")
+    return df_saip, pd.merge(df_balju, farmer_tax_types, on="업체명", how="left")
+
+def order_text_lines(df_src, mixed):
+    grp = df_src.groupby(["과세구분", "__parent"]).agg({"발주_수량": "sum"}).reset_index()
+    lines = []
+    for _, r in grp.iterrows():
+        prefix = f"[{r['과세구분']}] " if mixed else ""
+        lines.append(f"- {prefix}{r['__parent']}: {int(r['발주_수량'])}개")
+    return lines
+
+def order_message(farmer, item_lines, matched_requests=()):
+    base_lines = [
+        f"[품앗이소비자생활협동조합 발주 요청]",
+        f"{farmer} 농가님, 안녕하세요.",
+        f"조합원님들의 사랑으로 판매된 품목의 추가 발주를 요청드립니다.\n"
+    ]
+    base_lines.extend(item_lines)
+
+    if matched_requests:
+        base_lines.append("\n[📌 현장 추가 요청 (확인 부탁드립니다)]")
+        for mr in matched_requests:
+            note = f" - {mr.get('content','')}" if mr.get('content','') else ""
+            base_lines.append(f"- {mr.get('item_name','')} ({mr.get('urgency','')}){note}")
+
+    base_lines.append("\n정직한 땀방울에 항상 감사드립니다. 🙏")
+    return "\n".join(base_lines)
+
+def order_book(agg_all, lines=None):
+    """분석 1회당 한 번 만드는 농가별 발주장부. 화면에서는 농가/과세 전환이 dict 조회.
+    rows: 농가별로 연속 배치한 발주 대상 (농가 순서는 우선순위 순 그대로)
+    farmers: 농가 → 행 구간, 과세유형, 합계, 품목 수, 연락처, 발주 문구 줄
+    lines 를 주면 (야간 스냅샷) 그 농가의 문구는 다시 만들지 않음."""
+    df_saip, df_balju = split_balju(agg_all)
+    rank = {f: i for i, f in enumerate(df_balju["업체명"].drop_duplicates())}
+    rows = df_balju.sort_values("업체명", key=lambda s: s.map(rank), kind="stable").reset_index(drop=True)
+
+    names = rows["업체명"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]]) if len(names) else np.array([], dtype=int)
+    stops = np.r_[starts[1:], len(names)]
+    totals = rows.groupby("업체명", sort=False)["총판매액"].sum()
+
+    # order_text_lines 와 같은 (과세구분, __parent) 정렬/합계를 전체에 한 번에
+    g = rows.groupby(["업체명", "과세구분", "__parent"])["발주_수량"].sum().reset_index()
+    mixed = g["업체명"].map(rows.drop_duplicates("업체명").set_index("업체명")["농가_과세유형"]) == MIXED_TAX
+    prefix = np.where(mixed, "[" + g["과세구분"].astype(str) + "] ", "")
+    g["__line"] = ["- " + p + str(n) + ": " + str(int(q)) + "개" for p, n, q in zip(prefix, g["__parent"], g["발주_수량"])]
+    rendered = g.groupby("업체명", sort=False)["__line"].agg(list).to_dict()
+    lines = lines or {}
+
+    farmers, by_tax = {}, {}
+    for f, a, b in zip(names[starts], starts, stops):
+        tax = rows.at[a, "농가_과세유형"]
+        farmers[f] = {
+            "rows": slice(int(a), int(b)), "tax": tax, "total": totals[f], "count": int(b - a),
+            "phone": rows.at[a, "clean_phone"] if "clean_phone" in rows.columns else "",
+            "email": rows.at[a, "clean_email"] if "clean_email" in rows.columns else "",
+            "lines": lines.get(f, rendered.get(f, [])),
+        }
+        by_tax.setdefault(tax, []).append(f)
+    saip = {k: d for k, d in df_saip.groupby("업체명", sort=False)}
+    return {"rows": rows, "farmers": farmers, "by_tax": by_tax, "saip": saip}
+
+# ══════════════════════════════════════════
+# ♻️ 제로웨이스트
+# ══════════════════════════════════════════
+def parent_zw(x):
+    s = str(x)
+    s = re.sub(r"\(?벌크\)?", "", s)
+    s = re.sub(r"\(?bulk\)?", "", s, flags=re.IGNORECASE)
+    return re.sub(r"\(.*?\)", "", s).replace("*", "").replace("()", "").strip().replace(" ", "")
+
+def _zw_partial(df_zw, cols):
+    s_item, s_qty, s_amt, s_farmer = cols[:4]
+    df_zw["__parent"] = df_zw[s_item].apply(parent_zw)
+    df_zw[s_amt] = df_zw[s_amt].apply(to_num)
+
+    def type_tag(i, f):
+        i, f2 = str(i), (str(f) if pd.notna(f) else "")
+        return "벌크(무포장)" if ("벌크" in i or "bulk" in i.lower() or "벌크" in f2) else "일반(포장)"
+
+    farmers = df_zw[s_farmer] if s_farmer else [None] * len(df_zw)
+    df_zw["__type"] = [type_tag(i, f) for i, f in zip(df_zw[s_item], farmers)]
+    return df_zw.groupby(["__parent", "__type"])[s_amt].sum().reset_index()
+
+def zw_group(df_zw):
+    """상품(부모명) × 벌크/포장 판매액. (grp, 금액열) 반환, 필수 열이 없으면 (None, None)."""
+    cols = detect_cols(df_zw.columns.tolist())
+    if not (cols[0] and cols[2]): return None, None
+    return _zw_partial(df_zw, cols), cols[2]
+
+def zw_group_chunks(chunks):
+    """zw_group 의 나눠 읽기 판. 금액열 이름은 첫 묶음 기준."""
+    parts, s_amt = [], None
+    for chunk in chunks:
+        cols = detect_cols(chunk.columns.tolist())
+        if not (cols[0] and cols[2]) or chunk.empty: continue
+        s_amt = s_amt or cols[2]
+        parts.append(_zw_partial(chunk, cols).rename(columns={cols[2]: s_amt}))
+    if not parts: return None, None
+    return merge_partials(parts, ["__parent", "__type"]), s_amt
+
+# ══════════════════════════════════════════
+# 📢 이음 - 단골 매칭
+# ══════════════════════════════════════════
+def loyal_cols(cols):
+    c_date   = next((c for c in cols if any(x in c for x in ["일시","날짜","date","Date"])), None)
+    c_farmer = next((c for c in cols if any(x in c for x in ["농가","공급자","생산자"])), None)
+    c_item   = next((c for c in cols if any(x in c for x in ["상품","품목"])), None)
+    c_member = (next((c for c in cols if "회원번호" in c), None) or next((c for c in cols if c == "회원"), None))
+    return c_date, c_farmer, c_item, c_member
+
+def _member_no(x):
+    s = re.sub(r"\.0$", "", str(x).strip())
+    return "" if s in ["", "nan", "None"] else s
+
+def match_loyal(df_sp, df_mem, months=3, min_cnt=4, now=None):
+    """농가 × 품목별로 기간 내 min_cnt 일 이상 구매한 회원 (단골_매칭.csv 형식)."""
+    c_date, c_farmer, c_item, c_member = loyal_cols(df_sp.columns.tolist())
+    out_cols = ["농가명", "품목명", "회원번호", "연락처", "구매횟수", "최근구매일"]
+    if not (c_date and c_farmer and c_member): return pd.DataFrame(columns=out_cols)
+
+    d = pd.DataFrame({
+        "농가명": df_sp[c_farmer].astype(str).str.replace(" ", ""),
+        "품목명": df_sp[c_item].astype(str) if c_item else "",
+        "회원번호": df_sp[c_member].map(_member_no),
+        "__day": pd.to_datetime(df_sp[c_date], errors="coerce").dt.normalize(),
+    })
+    cutoff = (now or pd.Timestamp.now()) - pd.DateOffset(months=months)
+    d = d[(d["회원번호"] != "") & (d["__day"] >= cutoff)]
+    g = d.groupby(["농가명", "품목명", "회원번호"])["__day"].agg(구매횟수="nunique", 최근구매일="max").reset_index()
+    g = g[g["구매횟수"] >= min_cnt]
+
+    phone = {}
+    if df_mem is not None:
+        m_no, m_ph = member_cols(df_mem.columns)
+        if m_no and m_ph:
+            phone = dict(zip(df_mem[m_no].map(_member_no), df_mem[m_ph].astype(str)))
+    g["연락처"] = g["회원번호"].map(phone).fillna("")
+    g["최근구매일"] = g["최근구매일"].dt.strftime("%Y-%m-%d")
+    return g.sort_values(["농가명", "구매횟수"], ascending=[True, False])[out_cols].reset_index(drop=True)
@@ -0,0 +1,38 @@
+import pandas as pd
+import datetime, json, os, shutil
+
+# ══════════════════════════════════════════
+# 야간 분석 스냅샷 저장소
+#  snapshots/<버전>/data.pkl + manifest.json, snapshots/LATEST 에 최신 버전 이름
+# ══════════════════════════════════════════
+SNAPSHOT_DIR = "snapshots"
+SCHEMA       = 1
+
+def save(data, meta, root=SNAPSHOT_DIR, keep=7):
+    ver = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    d = os.path.join(root, ver)
+    os.makedirs(d, exist_ok=True)
+    pd.to_pickle(data, os.path.join(d, "data.pkl"))
+    with open(os.path.join(d, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"schema": SCHEMA, "version": ver, **meta}, f, ensure_ascii=False, indent=1, default=str)
+    # 다 쓴 뒤에 포인터 교체 → 앱은 반쯤 쓴 스냅샷을 보지 않음
+    tmp = os.path.join(root, f"LATEST.{os.getpid()}.tmp")
+    with open(tmp, "w") as f: f.write(ver)
+    os.replace(tmp, os.path.join(root, "LATEST"))
+    for old in sorted(v for v in os.listdir(root) if os.path.isdir(os.path.join(root, v)))[:-keep]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return ver
+
+def latest(root=SNAPSHOT_DIR, day=None):
+    """(버전, manifest) 또는 None. day 를 주면 그날 만든 스냅샷만 (지난 분석으로 발주하지 않게)."""
+    try:
+        with open(os.path.join(root, "LATEST")) as f: ver = f.read().strip()
+        with open(os.path.join(root, ver, "manifest.json"), encoding="utf-8") as f: man = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if man.get("schema") != SCHEMA: return None
+    if day and str(man.get("created", ""))[:10] != day.isoformat(): return None
+    return ver, man
+
+def load(ver, root=SNAPSHOT_DIR):
+    return pd.read_pickle(os.path.join(root, ver, "data.pkl"))